@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PATH = os.path.join(REPO_ROOT, 'Credit_bureau_sample_data.json')
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def load_sample_reports():
+    """Load the three sample bureau reports shipped with the repo"""
+    with open(SAMPLE_PATH) as f:
+        return json.load(f)
+
+
+def _amount(rng, high):
+    return f'{rng.uniform(0, high):,.2f}' if rng.random() < 0.7 else rng.choice(['0.00', '-', '0'])
+
+
+def _date(rng, start, days, fmt):
+    return (start + timedelta(days=rng.uniform(0, days))).strftime(fmt)
+
+
+def make_reports(n, seed=0, enquiries=15, agreements=7, templates=None):
+    """Build n varied reports from the sample reports
+
+    The sections the extractor reads get fresh randomised values (so value
+    cardinality looks like a real archive) while the bulky sections it
+    ignores are shared with the template to keep memory use manageable.
+    """
+    rng = random.Random(seed)
+    templates = templates or load_sample_reports()
+    today = datetime.now()
+    reports = []
+    for i in range(n):
+        template = templates[i % len(templates)]['data']['consumerfullcredit']
+        consumer = dict(template)
+        consumer['accountrating'] = {
+            field: str(rng.choice([0, 0, 0, 1, 2, 3, 5]))
+            for field in template['accountrating']
+        }
+        consumer['creditaccountsummary'] = dict(
+            template['creditaccountsummary'],
+            totaloutstandingdebt=_amount(rng, 500000),
+            amountarrear=_amount(rng, 50000),
+            totalmonthlyinstalment=_amount(rng, 100000),
+            totalnumberofjudgement=str(rng.choice([0, 0, 0, 1])),
+        )
+        consumer['enquiryhistorytop'] = [
+            dict(template['enquiryhistorytop'][j % len(template['enquiryhistorytop'])],
+                 daterequested=_date(rng, today - timedelta(days=400), 400, '%d/%m/%Y %H:%M:%S'))
+            for j in range(enquiries)
+        ]
+        consumer['creditagreementsummary'] = [
+            dict(template['creditagreementsummary'][j % len(template['creditagreementsummary'])],
+                 amountoverdue=_amount(rng, 30000),
+                 currentbalanceamt=_amount(rng, 300000),
+                 openingbalanceamt=_amount(rng, 900000),
+                 instalmentamount=_amount(rng, 40000),
+                 loanduration=str(rng.randint(0, 1500)))
+            for j in range(agreements)
+        ]
+        consumer['deliquencyinformation'] = dict(
+            template['deliquencyinformation'], monthsinarrears=str(rng.randint(0, 120)))
+        consumer['personaldetailssummary'] = dict(
+            template['personaldetailssummary'],
+            birthdate=_date(rng, datetime(1950, 1, 1), 365 * 50, '%d/%m/%Y'))
+        reports.append({'application_id': i, 'data': {'consumerfullcredit': consumer}})
+    return reports
+
+
+def write_reports(path, n, jsonl=False, templates=None):
+    """Write n synthetic reports to path as a JSON array or JSON Lines file"""
+    templates = templates or load_sample_reports()
+    with open(path, 'w') as f:
+        if not jsonl:
+            f.write('[')
+        for i in range(n):
+            report = dict(templates[i % len(templates)], application_id=i)
+            if jsonl:
+                f.write(json.dumps(report) + '\n')
+            else:
+                f.write((',' if i else '') + json.dumps(report))
+        if not jsonl:
+            f.write(']')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timeit(func, *args, repeat=3, **kwargs):
+    """Return (best wall time in seconds, result of the last call)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
@@ -0,0 +1,106 @@
+"""Worker startup and memory: the pickled pipeline vs the memory-mapped artifact
+
+Writes the compiled artifact of credit_risk_model.pkl to a temporary
+directory, then starts 1 and N worker processes at once, each loading a
+model the way a pre-fork server's workers would and scoring one
+applicant: CreditRiskScorer on the pickle (joblib.load) or
+CompiledModel.load on the artifact. Once every worker is ready it reads
+their /proc/<pid>/smaps_rollup and reports the time until the last one
+was ready, the summed RSS (counts shared pages in every process), the
+summed PSS (shared pages split between the processes sharing them) and
+the summed private memory; for the artifact also the PSS of its mapping
+in one worker. The loaded artifact must reject records that lack a
+column with ValueError. Linux only.
+
+Usage: python benchmarks/bench_artifact.py [max_workers]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from _common import REPO_ROOT
+from bench_preprocessor import incomplete, rejects
+from bench_scoring import applicants
+from credit_risk_compiled import CompiledModel
+from credit_risk_scorer import DEFAULT_MODEL_PATH
+
+WORKER = '''
+import json, sys, time
+start = time.perf_counter()
+{load}
+score = float(model.score(json.loads(sys.argv[1]))[0])
+print(json.dumps({{'load_seconds': time.perf_counter() - start, 'score': score}}), flush=True)
+sys.stdin.read()  # stay alive until the parent has measured
+'''
+LOADERS = {
+    'pickle': 'from credit_risk_scorer import CreditRiskScorer\nmodel = CreditRiskScorer({path!r})',
+    'artifact': 'from credit_risk_compiled import CompiledModel\nmodel = CompiledModel.load({path!r})',
+}
+
+
+def memory_kb(pid, path=None):
+    """Rss, Pss and private kB of a process, or of its mappings of `path`"""
+    fields = {'Rss': 0, 'Pss': 0, 'Private_Clean': 0, 'Private_Dirty': 0}
+    source = f'/proc/{pid}/smaps' if path else f'/proc/{pid}/smaps_rollup'
+    with open(source) as f:
+        mapped = path is None
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in fields:
+                if mapped:
+                    fields[name] += int(rest.split()[0])
+            elif path is not None and '-' in line.split(' ', 1)[0]:  # a mapping's header line
+                mapped = line.rstrip().endswith(path)
+    return fields['Rss'], fields['Pss'], fields['Private_Clean'] + fields['Private_Dirty']
+
+
+def start_workers(mode, path, n, record):
+    code = WORKER.format(load=LOADERS[mode].format(path=path))
+    start = time.perf_counter()
+    workers = [subprocess.Popen([sys.executable, '-c', code, json.dumps(record)], cwd=REPO_ROOT,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(n)]
+    results = [json.loads(worker.stdout.readline()) for worker in workers]
+    return time.perf_counter() - start, workers, results
+
+
+def main(max_workers):
+    record = {key: None if value != value else value  # NaN is not JSON
+              for key, value in applicants(1)[0].items()}
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = os.path.join(tmp, 'credit_risk_model.crm')
+        CompiledModel.from_pipeline(joblib.load(DEFAULT_MODEL_PATH)).save(artifact)
+        model = CompiledModel.load(artifact)
+        assert all(rejects(model.score, bad) for bad in incomplete(record))
+        del model  # unmap it, or it would share (and split the PSS of) the workers' pages
+        paths = {'pickle': DEFAULT_MODEL_PATH, 'artifact': artifact}
+        print(f'pickle {os.path.getsize(DEFAULT_MODEL_PATH) / 1024:.0f} KiB, '
+              f'artifact {os.path.getsize(artifact) / 1024:.0f} KiB')
+        print(f"{'model':<10}{'workers':>8}{'startup s':>11}{'load ms':>9}"
+              f"{'RSS MB':>9}{'PSS MB':>9}{'private MB':>12}")
+        scores = set()
+        for mode in LOADERS:
+            for n in sorted({1, max_workers}):
+                seconds, workers, results = start_workers(mode, paths[mode], n, record)
+                try:
+                    rss, pss, private = np.sum([memory_kb(w.pid) for w in workers], axis=0) / 1024
+                    mapping = memory_kb(workers[0].pid, artifact) if mode == 'artifact' else None
+                finally:
+                    for worker in workers:
+                        worker.communicate('')
+                scores.update(round(r['score'], 9) for r in results)
+                load_ms = np.mean([r['load_seconds'] for r in results]) * 1000
+                print(f'{mode:<10}{n:8d}{seconds:11.2f}{load_ms:9.0f}{rss:9.1f}{pss:9.1f}{private:12.1f}')
+                if mapping:
+                    print(f'{"":<10}artifact mapping in one worker: RSS {mapping[0]} kB, PSS {mapping[1]} kB')
+        assert len(scores) == 1, scores
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
@@ -0,0 +1,55 @@
+"""Peak memory of process_reports: FeatureBuffer vs a list of row dicts
+
+Streams n reports (the sample reports under fresh application_ids, so the
+input itself takes no memory) through the python engine, once collecting
+row dicts into a list for pd.DataFrame (the previous behaviour) and once
+through process_reports, which writes rows into a FeatureBuffer. Each mode
+runs in its own process so peak RSS is measured independently.
+
+Usage: python benchmarks/bench_buffer.py [n_reports]
+"""
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from _common import load_sample_reports, peak_rss_mb
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def stream(n):
+    templates = load_sample_reports()
+    for i in range(n):
+        yield dict(templates[i % len(templates)], application_id=i)
+
+
+def run(mode, n):
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'dicts':
+        df = pd.DataFrame(list(extractor.iter_features(stream(n), as_of))).set_index(
+            'application_id')
+    else:
+        df = extractor.process_reports(stream(n), as_of=as_of)
+    seconds = time.perf_counter() - start
+    print(f'{mode:<8}{seconds:9.1f}{peak_rss_mb() - baseline:14.0f}'
+          f'{df.memory_usage(deep=True).sum() / 2 ** 20:11.0f}')
+
+
+def main(n):
+    print(f'{n:,} reports')
+    print(f"{'mode':<8}{'seconds':>9}{'peak RSS MB':>14}{'frame MB':>11}")
+    for mode in ('dicts', 'buffer'):
+        subprocess.run([sys.executable, __file__, str(n), mode], check=True)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    if len(sys.argv) > 2:
+        run(sys.argv[2], n)
+    else:
+        main(n)
@@ -0,0 +1,55 @@
+"""process_reports with and without a FeatureCache on a 50%-duplicate archive
+
+Half of the reports are re-pulls: the payload of an earlier report under a
+new application_id. Runs extraction uncached, then with an empty cache
+(cold: only in-batch duplicates are saved) and again with the filled cache
+(warm: a re-run over the same archive).
+
+Usage: python benchmarks/bench_cache.py [n_reports]
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_cache import FeatureCache
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def duplicate_workload(n, seed=0):
+    rng = random.Random(seed)
+    unique = make_reports(n - n // 2, seed=seed)
+    repulls = [dict(rng.choice(unique), application_id=len(unique) + i) for i in range(n // 2)]
+    reports = unique + repulls
+    rng.shuffle(reports)
+    return reports
+
+
+def main(n):
+    reports = duplicate_workload(n)
+    extractor = CreditBureauFeatureExtractor()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FeatureCache(os.path.join(tmp, 'features.sqlite'), max_entries=n)
+        as_of = cache.bucket(datetime.now())
+        uncached_s, expected = timeit(extractor.process_reports, reports, as_of=as_of, repeat=1)
+        cold_s, cold = timeit(extractor.process_reports, reports, as_of=as_of, cache=cache,
+                              repeat=1)
+        cold_stats = cache.stats()
+        warm_s, warm = timeit(extractor.process_reports, reports, as_of=as_of, cache=cache,
+                              repeat=1)
+        pd.testing.assert_frame_equal(cold, expected, check_exact=True)
+        pd.testing.assert_frame_equal(warm, expected, check_exact=True)
+        size_mb = os.path.getsize(cache.path) / 2 ** 20
+        print(f'{n} reports, 50% duplicates, cache file {size_mb:.1f} MB')
+        print(f'uncached    {uncached_s:7.2f} s')
+        print(f'cold cache  {cold_s:7.2f} s  {uncached_s / cold_s:4.1f}x  {cold_stats}')
+        print(f'warm cache  {warm_s:7.2f} s  {uncached_s / warm_s:4.1f}x  {cache.stats()}')
+        cache.close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,63 @@
+"""clean_numeric (legacy regex, scalar fast path) vs bulk clean_numeric_array
+
+Usage: python benchmarks/bench_clean_numeric.py [n_values]
+"""
+import random
+import re
+import sys
+
+import numpy as np
+
+from _common import timeit
+from credit_bureau_columnar import clean_numeric_array
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def legacy_clean_numeric(value):
+    """clean_numeric as it was before the fast path, kept as the reference"""
+    if value is None or isinstance(value, (int, float)):
+        return value if value is not None else 0
+    if isinstance(value, str) and value.strip() in ('', '-', 'null', 'None'):
+        return 0
+    try:
+        return float(re.sub(r'[^\d.]', '', str(value)))
+    except:  # noqa: E722
+        return 0
+
+
+def mixed_values(n, seed=0):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.5:
+            values.append(f'{rng.uniform(0, 1e6):,.2f}')
+        elif r < 0.7:
+            values.append(str(rng.randint(0, 30)))
+        elif r < 0.85:
+            values.append(rng.choice(['-', '', 'null', 'None', None, '0.00']))
+        else:
+            values.append(rng.choice(['N/A', ' 12 ', '1.2.3', '-5', '12kg', '.', '٣٤']))
+    return values
+
+
+def main(n):
+    values = mixed_values(n)
+    extractor = CreditBureauFeatureExtractor()
+    expected = np.array([legacy_clean_numeric(v) for v in values], dtype=np.float64)
+
+    legacy_s, _ = timeit(lambda: [legacy_clean_numeric(v) for v in values])
+    scalar_s, scalar = timeit(lambda: [extractor.clean_numeric(v) for v in values])
+    bulk_s, bulk = timeit(clean_numeric_array, values, extractor)
+    np.testing.assert_array_equal(np.array(scalar, dtype=np.float64), expected)
+    np.testing.assert_array_equal(bulk, expected)
+
+    print(f'{n:,} mixed values')
+    for name, seconds in [('legacy clean_numeric', legacy_s),
+                          ('clean_numeric (fast path)', scalar_s),
+                          ('clean_numeric_array', bulk_s)]:
+        print(f'{name:<28}{seconds:8.3f} s{legacy_s / seconds:8.1f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
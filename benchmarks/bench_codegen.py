@@ -0,0 +1,90 @@
+"""Spec-generated section functions vs the hand-written process_* methods
+
+Times the account_ratings, credit_summary and guarantor_info sections per
+report, calling hand-written methods (kept here for comparison only) and
+the functions generated from their SECTIONS specs on the same inputs,
+then the three sections end to end through process_reports.
+
+Usage: python benchmarks/bench_codegen.py [n_reports]
+"""
+import sys
+
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+SECTIONS = ('account_ratings', 'credit_summary', 'guarantor_info')
+
+
+class HandWritten(CreditBureauFeatureExtractor):
+    """The three sections as plain methods, as written before the specs"""
+
+    def process_account_ratings(self, account_rating):
+        features = {}
+        features['no_of_bad_accounts'] = sum(
+            self._clean_field(account_rating.get(field, 0), field)
+            for field in self.BAD_ACCOUNT_FIELDS
+        )
+        features['no_of_good_accounts'] = sum(
+            self._clean_field(account_rating.get(field, 0), field)
+            for field in self.GOOD_ACCOUNT_FIELDS
+        )
+        return features
+
+    def process_credit_summary(self, credit_summary):
+        features = {}
+        features['total_outstanding_debt'] = self._clean_field(
+            credit_summary.get('totaloutstandingdebt', 0), 'totaloutstandingdebt')
+        features['total_arrears'] = self._clean_field(
+            credit_summary.get('amountarrear', 0), 'amountarrear')
+        features['total_monthly_instalment'] = self._clean_field(
+            credit_summary.get('totalmonthlyinstalment', 0), 'totalmonthlyinstalment')
+        features['total_number_of_judgements'] = self._clean_field(
+            credit_summary.get('totalnumberofjudgement', 0), 'totalnumberofjudgement')
+        return features
+
+    def process_guarantor_info(self, guarantor_details, guarantor_count):
+        features = {
+            'guarantor_count': self._clean_field(guarantor_count.get('accounts', 0), 'accounts'),
+            'has_guarantor': 0
+        }
+        if guarantor_details:
+            for k, v in guarantor_details.items():
+                if k != 'guarantordateofbirth' and v not in (None, '', 'null', '1900-01-01T00:00:00+01:00'):
+                    features['has_guarantor'] = 1
+                    break
+        return features
+
+
+def run(function, extractor, inputs):
+    return [function(extractor, *args) for args in inputs]
+
+
+def main(n):
+    reports = make_reports(n)
+    extractor = CreditBureauFeatureExtractor()
+    print(f'{n} reports')
+    print(f"{'section':<18}{'method us/report':>18}{'generated us/report':>21}{'speedup':>9}")
+    for name in SECTIONS:
+        section = extractor.SECTIONS[name]
+        inputs = [extractor._section_inputs(section, report['data']['consumerfullcredit'])
+                  for report in reports]
+        method = getattr(HandWritten, section['method'])
+        method_s, expected = timeit(run, method, extractor, inputs)
+        generated = getattr(CreditBureauFeatureExtractor, section['method'])
+        generated_s, result = timeit(run, generated, extractor, inputs)
+        assert result == expected
+        print(f'{name:<18}{method_s / n * 1e6:18.2f}{generated_s / n * 1e6:21.2f}'
+              f'{method_s / generated_s:9.2f}')
+
+    features = [feature for name in SECTIONS for feature in extractor.SECTIONS[name]['features']]
+    method_s, expected = timeit(HandWritten().process_reports, reports, features=features)
+    generated_s, df = timeit(extractor.process_reports, reports, features=features)
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    print(f"{'process_reports':<18}{method_s / n * 1e6:18.2f}{generated_s / n * 1e6:21.2f}"
+          f'{method_s / generated_s:9.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
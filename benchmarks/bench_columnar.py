@@ -0,0 +1,29 @@
+"""Per-report python engine vs the columnar engine of process_reports
+
+Usage: python benchmarks/bench_columnar.py [n_reports]
+"""
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def main(n):
+    reports = make_reports(n)
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+    python_s, expected = timeit(extractor.process_reports, reports, as_of=as_of, repeat=1)
+    columnar_s, df = timeit(extractor.process_reports, reports, engine='columnar',
+                            as_of=as_of, repeat=1)
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    print(f'{n} reports')
+    print(f'python   {python_s:7.2f} s  {n / python_s:>10,.0f} reports/s')
+    print(f'columnar {columnar_s:7.2f} s  {n / columnar_s:>10,.0f} reports/s  '
+          f'({python_s / columnar_s:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,68 @@
+"""strptime-based date handling vs the cached / batch date layer
+
+Times calculate_age + process_enquiry_history over reports carrying ~50
+enquiries each, and the columnar engine which uses the batch parser.
+
+Usage: python benchmarks/bench_dates.py [n_reports]
+"""
+import sys
+from datetime import datetime
+
+from _common import make_reports, timeit
+from credit_bureau_dates import _parse_str
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+class LegacyDateExtractor(CreditBureauFeatureExtractor):
+    """Date handling as it was before the date layer, kept as the reference"""
+
+    def calculate_age(self, birthdate_str):
+        if not birthdate_str or birthdate_str.strip() in ('', '-'):
+            return None
+        try:
+            birthdate = datetime.strptime(birthdate_str, "%d/%m/%Y")
+            today = datetime.today()
+            return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+        except:  # noqa: E722
+            return None
+
+    def process_enquiry_history(self, enquiry_history):
+        features = {'total_recent_enquiries': 0}
+        if not enquiry_history:
+            return features
+        recent_count = 0
+        for enquiry in enquiry_history:
+            try:
+                enquiry_date = datetime.strptime(enquiry['daterequested'], "%d/%m/%Y %H:%M:%S")
+                if (datetime.now() - enquiry_date).days <= 90:
+                    recent_count += 1
+            except:  # noqa: E722
+                continue
+        features['total_recent_enquiries'] = recent_count
+        return features
+
+
+def date_features(extractor, consumers):
+    for consumer in consumers:
+        extractor.calculate_age(consumer['personaldetailssummary'].get('birthdate'))
+        extractor.process_enquiry_history(consumer['enquiryhistorytop'])
+
+
+def main(n):
+    reports = make_reports(n, enquiries=50)
+    consumers = [r['data']['consumerfullcredit'] for r in reports]
+    legacy_s, _ = timeit(date_features, LegacyDateExtractor(), consumers, repeat=1)
+    _parse_str.cache_clear()
+    cold_s, _ = timeit(date_features, CreditBureauFeatureExtractor(), consumers, repeat=1)
+    warm_s, _ = timeit(date_features, CreditBureauFeatureExtractor(), consumers, repeat=1)
+    columnar_s, _ = timeit(CreditBureauFeatureExtractor().process_reports, reports,
+                           engine='columnar', repeat=1)
+    print(f'{n} reports x 50 enquiries ({_parse_str.cache_info()})')
+    print(f'legacy strptime           {legacy_s:7.2f} s')
+    print(f'date layer (cold cache)   {cold_s:7.2f} s  {legacy_s / cold_s:5.1f}x')
+    print(f'date layer (warm cache)   {warm_s:7.2f} s  {legacy_s / warm_s:5.1f}x')
+    print(f'columnar engine, all features {columnar_s:7.2f} s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
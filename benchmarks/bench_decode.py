@@ -0,0 +1,64 @@
+"""Partial decoding (iter_reports(keys=...)) vs json.load and full streaming
+
+Decodes the sample reports scaled up to a file of n reports and reports
+input throughput, and the memory blocks and bytes retained per decoded
+report (what the decoder materialised).
+
+Usage: python benchmarks/bench_decode.py [n_reports]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from _common import timeit, write_reports
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+from credit_bureau_reader import iter_reports
+
+SELECTION = ['total_arrears', 'total_recent_enquiries', 'max_months_in_arrears']
+
+
+def json_load(path):
+    with open(path, 'rb') as f:
+        return json.load(f)
+
+
+def measure(decode, path, n):
+    """(MB/s, blocks per report, bytes per report) for decoding the whole file"""
+    seconds, reports = timeit(decode, path)
+    del reports
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    reports = decode(path)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks
+    del reports
+    return os.path.getsize(path) / 1e6 / seconds, blocks / n, retained / n
+
+
+def main(n):
+    extractor = CreditBureauFeatureExtractor()
+    modes = [
+        ('json.load', json_load),
+        ('iter_reports', lambda path: list(iter_reports(path))),
+        ('keys: all features', lambda path: list(iter_reports(
+            path, keys=extractor.input_keys()))),
+        ('keys: 3 features', lambda path: list(iter_reports(
+            path, keys=extractor.input_keys(SELECTION)))),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'reports.json')
+        write_reports(path, n)
+        print(f'{n} reports, {os.path.getsize(path) / 1e6:.1f} MB')
+        print(f"{'mode':<22}{'MB/s':>8}{'blocks/report':>15}{'KB/report':>11}")
+        for name, decode in modes:
+            rate, blocks, retained = measure(decode, path, n)
+            print(f'{name:<22}{rate:8.1f}{blocks:15,.0f}{retained / 1024:11.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,51 @@
+"""Rolling delinquency counts: cost against the number of windows
+
+Parses the synthetic payment histories of bench_payment_history once, then
+times account and report level window counts for 1, 4 and 24 windows with
+the prefix sums of PaymentHistory and with a re-scan of the months per
+window.
+
+Usage: python benchmarks/bench_delinquency_windows.py [n_reports] [accounts_per_report]
+"""
+import sys
+
+import numpy as np
+
+from _common import timeit
+from bench_payment_history import make_reports
+from credit_bureau_columnar import payment_history_tensor
+
+THRESHOLDS = (30, 60, 90)
+WINDOW_SETS = [(3,), (3, 6, 12, 24), tuple(range(1, 25))]
+
+
+def prefix_sums(history, windows):
+    return (history.window_counts(windows, THRESHOLDS),
+            history.report_window_counts(windows, THRESHOLDS))
+
+
+def rescan(history, windows):
+    """One pass over the first w months per window"""
+    exceeds = history.status[:, None, :] >= np.array(THRESHOLDS, dtype=np.int16)[None, :, None]
+    rows, starts = history.segments()
+    months = np.zeros((len(history),) + exceeds.shape[1:], dtype=bool)
+    months[rows] = np.logical_or.reduceat(exceeds, starts, axis=0)
+    accounts = np.stack([exceeds[:, :, :w].sum(axis=2) for w in windows], axis=2)
+    reports = np.stack([months[:, :, :w].sum(axis=2) for w in windows], axis=2)
+    return accounts, reports
+
+
+def main(n, accounts):
+    history = payment_history_tensor(make_reports(n, accounts))
+    print(f'{n} reports, {len(history.status):,} accounts, thresholds {THRESHOLDS}')
+    print(f"{'windows':>8}{'prefix sums (s)':>17}{'re-scan (s)':>13}")
+    for windows in WINDOW_SETS:
+        prefix_s, (by_account, by_report) = timeit(prefix_sums, history, windows)
+        rescan_s, expected = timeit(rescan, history, windows)
+        assert (by_account == expected[0]).all() and (by_report == expected[1]).all()
+        print(f'{len(windows):8}{prefix_s:17.3f}{rescan_s:13.3f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,56 @@
+"""Enquiry window counts against the number of windows, for enquiry-heavy reports
+
+Times process_enquiry_history (dates parsed once, sorted, one binary
+search per window) with 1, 5 and 20 windows against counting each window
+with its own pass over the parsed dates, and the columnar engine on the
+whole batch.
+
+Usage: python benchmarks/bench_enquiry_windows.py [n_reports] [enquiries_per_report]
+"""
+import sys
+from datetime import datetime
+
+from _common import make_reports, timeit
+from credit_bureau_dates import ENQUIRY_DATE_FORMAT, parse_date
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+WINDOW_SETS = [(90,), (7, 30, 90, 180, 365), tuple(range(20, 401, 20))]
+
+
+def scan_per_window(extractor, histories, as_of):
+    """Count each window (and its distinct subscribers) with a pass over the enquiries"""
+    for history in histories:
+        parsed = []
+        for enquiry in history:
+            date = parse_date(enquiry['daterequested'], ENQUIRY_DATE_FORMAT)
+            if date is not None:
+                parsed.append(((as_of - date).days, enquiry.get('subscribername')))
+        for window in extractor.ENQUIRY_WINDOWS:
+            sum(age <= window for age, _ in parsed)
+            len({name for age, name in parsed if age <= window and name})
+
+
+def bisect_windows(extractor, histories, as_of):
+    for history in histories:
+        extractor.process_enquiry_history(history, as_of)
+
+
+def main(n, enquiries):
+    reports = make_reports(n, enquiries=enquiries)
+    histories = [r['data']['consumerfullcredit']['enquiryhistorytop'] for r in reports]
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+    print(f'{n} reports x {enquiries} enquiries')
+    print(f"{'windows':>8}{'bisect (s)':>12}{'scan per window (s)':>21}{'columnar (s)':>14}")
+    for windows in WINDOW_SETS:
+        extractor.ENQUIRY_WINDOWS = windows
+        bisect_s, _ = timeit(bisect_windows, extractor, histories, as_of)
+        scan_s, _ = timeit(scan_per_window, extractor, histories, as_of)
+        columnar_s, _ = timeit(extractor.process_reports, reports, engine='columnar',
+                               as_of=as_of, features=['total_recent_enquiries'])
+        print(f'{len(windows):8}{bisect_s:12.3f}{scan_s:21.3f}{columnar_s:14.3f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 300)
@@ -0,0 +1,66 @@
+"""Cold start of the extractor: import time and first report, without pandas
+
+Runs fresh interpreters that import credit_bureau_feat_extractor and
+extract one sample report, and reports the module's cumulative import time
+from `python -X importtime`, the wall time of the whole process, and the
+same with pandas imported up front (what every process paid when the
+module imported it). Exits with status 1 if importing the module or
+calling extract_features loads NumPy or pandas, so it can guard the
+pandas-free core.
+
+Usage: python benchmarks/bench_import.py [repeat]
+"""
+import subprocess
+import sys
+import time
+
+from _common import REPO_ROOT, SAMPLE_PATH
+
+MODULE = 'credit_bureau_feat_extractor'
+HEAVY = ('numpy', 'pandas')
+EXTRACT = f'''
+import json, sys
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+with open({SAMPLE_PATH!r}) as f:
+    report = json.load(f)[0]
+CreditBureauFeatureExtractor().extract_features(report)
+print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}} & {set(HEAVY)!r})))
+'''
+
+
+def run(code, *options):
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, *options, '-c', code], cwd=REPO_ROOT,
+                          capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, done
+
+
+def import_time_us(stderr, module):
+    """Cumulative import time of `module` from -X importtime output"""
+    for line in stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise ValueError(f'{module} not in -X importtime output')
+
+
+def main(repeat):
+    run(f'import {MODULE}')  # write the bytecode caches first
+    imports = [import_time_us(run(f'import {MODULE}', '-X', 'importtime')[1].stderr, MODULE)
+               for _ in range(repeat)]
+    print(f'import {MODULE}: {min(imports) / 1000:.1f} ms (best of {repeat}, -X importtime)')
+
+    seconds, done = min((run(EXTRACT) for _ in range(repeat)), key=lambda r: r[0])
+    heavy = done.stdout.strip()
+    print(f'import + extract_features   {seconds * 1000:8.1f} ms per process'
+          f'  heavy modules: {heavy or "none"}')
+    seconds, _ = min((run('import pandas\n' + EXTRACT) for _ in range(repeat)),
+                     key=lambda r: r[0])
+    print(f'same with pandas imported   {seconds * 1000:8.1f} ms per process')
+    if heavy:
+        print(f'FAIL: the extraction core loaded {heavy}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,63 @@
+"""Incremental extraction (SectionMemo) on a refresh-heavy workload
+
+Every consumer is pulled once, then re-pulled; a refresh changes one or two
+sections (a new enquiry, an updated agreement, ...) and leaves the rest as
+before. Times the refresh pass with and without the memo from the first
+pass and reports the fraction of section work skipped.
+
+Usage: python benchmarks/bench_incremental.py [n_consumers]
+"""
+import random
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_cache import SectionMemo
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def refresh(report, fresh, rng):
+    """Re-pull of report: one or two sections taken from another report"""
+    consumer = dict(report['data']['consumerfullcredit'])
+    changes = rng.sample(['enquiryhistorytop', 'creditagreementsummary', 'creditaccountsummary',
+                          'accountrating', 'deliquencyinformation'], rng.choice([1, 1, 2]))
+    for key in changes:
+        consumer[key] = fresh['data']['consumerfullcredit'][key]
+    return {'application_id': report['application_id'] + 10 ** 7,
+            'data': {'consumerfullcredit': consumer}}
+
+
+def workload(n, seed=0):
+    rng = random.Random(seed)
+    first = make_reports(n, seed=seed)
+    for i, report in enumerate(first):
+        consumer = report['data']['consumerfullcredit']
+        consumer['subjectlist'] = dict(consumer['subjectlist'], consumerid=str(i))
+    fresh = make_reports(n, seed=seed + 1)
+    return first, [refresh(report, new, rng) for report, new in zip(first, fresh)]
+
+
+def main(n):
+    first, refreshed = workload(n)
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+    full_s, expected = timeit(extractor.process_reports, refreshed, as_of=as_of, repeat=1)
+
+    memo = SectionMemo()
+    extractor.process_reports(first, as_of=as_of, memo=memo)
+    memo.computed = memo.skipped = 0
+    incremental_s, df = timeit(extractor.process_reports, refreshed, as_of=as_of, memo=memo,
+                               repeat=1)
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    stats = memo.stats()
+    print(f'{n} consumers re-pulled, 1-2 of 7 sections changed each')
+    print(f'full extraction   {full_s:7.2f} s')
+    print(f'incremental       {incremental_s:7.2f} s  {full_s / incremental_s:4.1f}x')
+    print(f"section work skipped: {stats['skipped_fraction']:.1%} "
+          f"({stats['skipped']} of {stats['skipped'] + stats['computed']} sections)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
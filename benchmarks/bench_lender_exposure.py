@@ -0,0 +1,50 @@
+"""Lender exposure: grouped reduction at 10M agreement rows, and end to end
+
+Runs the lender_exposure kernel on 1M, 3M and 10M synthetic agreement rows
+(about 10 agreements per consumer over 2000 lenders) to show the cost stays
+linear, then the lender_exposure section with both engines on reports.
+
+Usage: python benchmarks/bench_lender_exposure.py [max_rows] [n_reports]
+"""
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_columnar import lender_exposure
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def agreement_rows(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_rows // 10
+    index = np.sort(rng.integers(0, n, n_rows))
+    lenders = rng.zipf(1.5, n_rows) % 2000
+    balances = rng.lognormal(10, 2, n_rows)
+    return index, lenders, balances, n
+
+
+def main(max_rows, n_reports):
+    print(f"{'rows':>12}{'seconds':>9}{'ns/row':>8}")
+    for n_rows in (max_rows // 10, max_rows * 3 // 10, max_rows):
+        rows = agreement_rows(n_rows)
+        seconds, _ = timeit(lender_exposure, *rows)
+        print(f'{n_rows:12,}{seconds:9.2f}{seconds / n_rows * 1e9:8.0f}')
+
+    reports = make_reports(n_reports, agreements=20)
+    extractor = CreditBureauFeatureExtractor()
+    features = list(extractor.SECTIONS['lender_exposure']['features'])
+    as_of = datetime.now()
+    python_s, expected = timeit(extractor.process_reports, reports, as_of=as_of, features=features)
+    columnar_s, df = timeit(extractor.process_reports, reports, engine='columnar', as_of=as_of,
+                            features=features)
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    print(f'{n_reports} reports x 20 agreements: python {python_s:.2f} s, '
+          f'columnar {columnar_s:.2f} s ({python_s / columnar_s:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
@@ -0,0 +1,157 @@
+"""Malformed bureau values: exception-free classification vs try/except parsing
+
+Corrupts a fraction of the amounts, birthdates and enquiry dates of the
+synthetic reports ('-', 'N/A', '12kg', ISO dates, missing keys, ...) and
+times the python engine against a copy of the extractor with the previous
+try/except parsing, on the sections reading those values (the generated
+spec sections are left out: overriding clean_numeric changes them too).
+Also times clean_numeric alone on the same mix of values.
+
+Usage: python benchmarks/bench_malformed.py [n_reports] [malformed_fraction]
+"""
+import random
+import re
+import sys
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_dates import BIRTHDATE_FORMAT, ENQUIRY_DATE_FORMAT, parse_date
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+SECTIONS = ('enquiry_history', 'credit_agreements', 'product_aggregates', 'lender_exposure',
+            'delinquency', 'personal_details')
+AMOUNTS = ('amountoverdue', 'currentbalanceamt', 'openingbalanceamt', 'instalmentamount',
+           'loanduration')
+BAD_NUMBERS = ['-', 'N/A', '12kg', '1.2.3', 'R 1,200.50', 'null', '', '.', 'n/a']
+BAD_DATES = ['-', 'N/A', '', '2021-03-04', '31/02/2020', 'unknown', None]
+
+
+@lru_cache(maxsize=1 << 16)
+def _legacy_parse(value, fmt):
+    # parse_date's fixed-width path, else strptime raising on malformed strings
+    date = parse_date(value, fmt)
+    if date is not None:
+        return date
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
+
+
+def legacy_parse_date(value, fmt):
+    return _legacy_parse(value, fmt) if type(value) is str else None
+
+
+class Legacy(CreditBureauFeatureExtractor):
+    """The extractor with the try/except parsing it had before"""
+
+    def clean_numeric(self, value):
+        if value is None or isinstance(value, (int, float)):
+            return value if value is not None else 0
+        if isinstance(value, str):
+            plain = value.replace(',', '')
+            head, _, tail = plain.partition('.')
+            if (head or tail) and (not head or head.isdecimal()) and (not tail or tail.isdecimal()):
+                return float(plain)
+            if value.strip() in ('', '-', 'null', 'None'):
+                return 0
+        try:
+            return float(re.sub(r'[^\d.]', '', str(value)))
+        except:  # noqa: E722
+            return 0
+
+    def calculate_age(self, birthdate_str, as_of=None):
+        if not birthdate_str or birthdate_str.strip() in ('', '-'):
+            return None
+        birthdate = legacy_parse_date(birthdate_str, BIRTHDATE_FORMAT)
+        if birthdate is None:
+            return None
+        today = as_of or datetime.now()
+        return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+
+    def process_enquiry_history(self, enquiry_history, as_of=None):
+        features = dict.fromkeys(self.SECTIONS['enquiry_history']['features'], 0)
+        if not enquiry_history:
+            return features
+        ages = []
+        latest = {}
+        for enquiry in enquiry_history:
+            try:
+                enquiry_date = legacy_parse_date(enquiry['daterequested'], ENQUIRY_DATE_FORMAT)
+            except:  # noqa: E722
+                continue
+            if enquiry_date is None:
+                continue
+            age = (as_of - enquiry_date).days
+            ages.append(age)
+            subscriber = enquiry.get('subscribername')
+            if isinstance(subscriber, str) and subscriber.strip():
+                latest[subscriber] = min(age, latest.get(subscriber, age))
+        ages.sort()
+        subscriber_ages = sorted(latest.values())
+        features['total_recent_enquiries'] = bisect_right(ages, 90)
+        for window in self.ENQUIRY_WINDOWS:
+            features[f'enquiries_{window}d'] = bisect_right(ages, window)
+            features[f'distinct_subscribers_{window}d'] = bisect_right(subscriber_ages, window)
+        return features
+
+
+def corrupt(reports, fraction, seed=0):
+    rng = random.Random(seed)
+    for report in reports:
+        consumer = report['data']['consumerfullcredit']
+        consumer['creditagreementsummary'] = [dict(a) for a in consumer['creditagreementsummary']]
+        for agreement in consumer['creditagreementsummary']:
+            for field in AMOUNTS:
+                if rng.random() < fraction:
+                    agreement[field] = rng.choice(BAD_NUMBERS)
+        if rng.random() < fraction:
+            consumer['deliquencyinformation'] = dict(
+                consumer['deliquencyinformation'], monthsinarrears=rng.choice(BAD_NUMBERS))
+        if rng.random() < fraction:
+            consumer['personaldetailssummary'] = dict(
+                consumer['personaldetailssummary'], birthdate=rng.choice(BAD_DATES))
+        enquiries = []
+        for enquiry in consumer['enquiryhistorytop']:
+            if rng.random() < fraction:
+                enquiry = dict(enquiry, daterequested=rng.choice(BAD_DATES))
+                if rng.random() < 0.3:
+                    del enquiry['daterequested']
+            enquiries.append(enquiry)
+        consumer['enquiryhistorytop'] = enquiries
+    return reports
+
+
+def main(n, fraction):
+    reports = corrupt(make_reports(n), fraction)
+    extractor, legacy = CreditBureauFeatureExtractor(), Legacy()
+    features = [name for section in SECTIONS for name in extractor.SECTIONS[section]['features']]
+    as_of = datetime.now()
+    print(f'{n} reports, {fraction:.0%} of amounts and dates malformed')
+
+    values = [a[field] for r in reports for a in r['data']['consumerfullcredit']['creditagreementsummary']
+              for field in AMOUNTS]
+    legacy_s, expected = timeit(lambda: [legacy.clean_numeric(v) for v in values])
+    clean_s, result = timeit(lambda: [extractor._clean_field(v, 'amount') for v in values])
+    assert result == expected
+    print(f'clean_numeric      legacy {legacy_s / len(values) * 1e9:6.0f} ns/value'
+          f'   now {clean_s / len(values) * 1e9:6.0f} ns/value   {legacy_s / clean_s:.2f}x')
+
+    legacy_s, expected = timeit(legacy.process_reports, reports, as_of=as_of, features=features)
+    clean_s, df = timeit(extractor.process_reports, reports, as_of=as_of, features=features)
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    print(f'process_reports    legacy {legacy_s / n * 1e6:6.1f} us/report'
+          f'  now {clean_s / n * 1e6:6.1f} us/report  {legacy_s / clean_s:.2f}x')
+    extractor.stats.reset()
+    extractor.process_reports(reports, as_of=as_of, features=features)
+    for field, kinds in extractor.stats.stats().items():
+        print(f'  {field:<18}' + '  '.join(f'{kind} {count}' for kind, count in kinds.items()))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.3)
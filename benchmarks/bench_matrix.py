@@ -0,0 +1,64 @@
+"""Raw reports to a model-ready float32 matrix: output='matrix' vs via a DataFrame
+
+The DataFrame route builds the frame, maps the categorical columns with
+CATEGORY_CODES and converts to float32, as a scorer had to do before.
+Both routes are timed end to end for each engine and must give the same
+matrix, then on already extracted rows to isolate the conversion itself.
+
+Usage: python benchmarks/bench_matrix.py [n_reports]
+"""
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_buffer import FeatureBuffer
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def encode_frame(extractor, df):
+    df = df.reindex(columns=extractor.output_features())
+    for name, codes in extractor.CATEGORY_CODES.items():
+        df[name] = df[name].map(codes)
+    return np.ascontiguousarray(df.apply(pd.to_numeric, errors='coerce').to_numpy(np.float32))
+
+
+def via_frame(extractor, reports, engine, as_of):
+    return encode_frame(extractor, extractor.process_reports(reports, engine=engine, as_of=as_of))
+
+
+def rows_to_frame_matrix(extractor, rows):
+    buffer = FeatureBuffer()
+    buffer.extend(rows)
+    return encode_frame(extractor, buffer.to_frame())
+
+
+def rows_to_matrix(extractor, rows):
+    buffer = FeatureBuffer()
+    buffer.extend(rows)
+    return buffer.to_matrix(extractor.output_features(), extractor.CATEGORY_CODES)
+
+
+def main(n):
+    reports = make_reports(n)
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+    print(f'{n} reports, {len(extractor.output_features())} features')
+    print(f"{'engine':<10}{'via frame (s)':>15}{'matrix (s)':>12}{'speedup':>9}")
+    for engine in ('python', 'columnar'):
+        frame_s, expected = timeit(via_frame, extractor, reports, engine, as_of)
+        matrix_s, matrix = timeit(extractor.process_reports, reports, engine=engine, as_of=as_of,
+                                  output='matrix')
+        np.testing.assert_array_equal(matrix.values, expected)
+        print(f'{engine:<10}{frame_s:15.3f}{matrix_s:12.3f}{frame_s / matrix_s:9.2f}')
+
+    rows = list(extractor.iter_features(reports, as_of))
+    frame_s, _ = timeit(rows_to_frame_matrix, extractor, rows)
+    matrix_s, _ = timeit(rows_to_matrix, extractor, rows)
+    print(f"{'rows only':<10}{frame_s:15.3f}{matrix_s:12.3f}{frame_s / matrix_s:9.2f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,71 @@
+"""Concurrent single-record scoring: one predict_proba per request vs MicroBatcher
+
+At each level of concurrency, that many asyncio clients send requests one
+after another until n_requests (at least one per client) are answered.
+Unbatched, every request runs CreditRiskScorer.score on its own in the
+default thread pool; batched, requests go through a MicroBatcher. Reports
+throughput, p50/p99 latency and the mean batch size.
+
+Usage: python benchmarks/bench_microbatch.py [n_requests] [max_wait_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from _common import REPO_ROOT
+from credit_risk_scorer import CreditRiskScorer, MicroBatcher
+
+DATA_PATH = os.path.join(REPO_ROOT, 'GermanCredit.csv')
+CONCURRENCY = (1, 10, 100, 1000)
+
+
+def applicants():
+    df = pd.read_csv(DATA_PATH).drop(columns=['Unnamed: 0', 'default', 'telephone'])
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+async def load(score, records, clients, n):
+    """(requests per second, latencies in ms, {record index: score}) for `clients` clients"""
+    per_client = max(1, n // clients)
+    latencies = []
+    scores = {}
+
+    async def client(c):
+        for i in range(c * per_client, (c + 1) * per_client):
+            start = time.perf_counter()
+            scores[i] = await score(records[i % len(records)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    return len(latencies) / (time.perf_counter() - start), np.array(latencies) * 1000, scores
+
+
+async def main(n, max_wait):
+    records = applicants()
+    scorer = CreditRiskScorer()
+    loop = asyncio.get_running_loop()
+
+    async def unbatched(record):
+        return (await loop.run_in_executor(None, scorer.score, [record]))[0].item()
+
+    print(f'{n} requests per level; batches close at 256 records or after {max_wait * 1000:g} ms')
+    print(f"{'clients':>8}{'mode':>11}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'batch':>7}")
+    for clients in CONCURRENCY:
+        rate, ms, expected = await load(unbatched, records, clients, n)
+        print(f'{clients:8}{"unbatched":>11}{rate:9.0f}{np.percentile(ms, 50):9.1f}'
+              f'{np.percentile(ms, 99):9.1f}{1:7}')
+        async with MicroBatcher(scorer, max_wait=max_wait) as batcher:
+            rate, ms, scores = await load(batcher.score, records, clients, n)
+        assert np.allclose([scores[i] for i in expected], list(expected.values()))
+        print(f'{clients:8}{"batched":>11}{rate:9.0f}{np.percentile(ms, 50):9.1f}'
+              f'{np.percentile(ms, 99):9.1f}{batcher.stats()["mean_batch_size"]:7.1f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+                     float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.002))
@@ -0,0 +1,67 @@
+"""Packed-array forest evaluation vs RandomForestClassifier.predict_proba
+
+Transforms applicants from GermanCredit.csv with the saved pipeline's
+preprocessor, packs its forest with PackedForest.from_forest and times
+predict_proba of both on single rows (median over the applicants) and on
+one batch, checking the probabilities agree to 1e-9.
+
+Usage: python benchmarks/bench_packed_forest.py [batch_rows] [single_rows]
+"""
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from _common import REPO_ROOT, timeit
+from credit_risk_compiled import PackedForest
+from credit_risk_scorer import DEFAULT_MODEL_PATH
+
+DATA_PATH = os.path.join(REPO_ROOT, 'GermanCredit.csv')
+TOLERANCE = 1e-9
+
+
+def applicants(n):
+    frame = pd.read_csv(DATA_PATH).drop(columns=['Unnamed: 0', 'default', 'telephone'])
+    return frame.iloc[np.arange(n) % len(frame)].reset_index(drop=True)
+
+
+def single_row_ms(predict, X):
+    seconds = []
+    for i in range(X.shape[0]):
+        row = X[i:i + 1]
+        start = time.perf_counter()
+        predict(row)
+        seconds.append(time.perf_counter() - start)
+    return np.median(seconds) * 1000
+
+
+def main(batch_rows, single_rows):
+    model = joblib.load(DEFAULT_MODEL_PATH)
+    forest = model.named_steps['classifier']
+    X = model.named_steps['preprocessor'].transform(applicants(batch_rows))
+    pack_s, packed = timeit(PackedForest.from_forest, forest, repeat=1)
+    print(f'{len(forest.estimators_)} trees, {len(packed.feature)} nodes, '
+          f'packed in {pack_s * 1000:.0f} ms; X is {type(X).__name__} {X.shape}')
+
+    forest_s, expected = timeit(forest.predict_proba, X, repeat=7)
+    packed_s, proba = timeit(packed.predict_proba, X, repeat=7)
+    error = np.abs(proba - expected).max()
+    assert error <= TOLERANCE, error
+    for i in range(single_rows):
+        error = max(error, np.abs(packed.predict_proba(X[i:i + 1]) - expected[i:i + 1]).max())
+    assert error <= TOLERANCE, error
+    print(f'max abs difference {error:.1e}')
+
+    print(f"{'rows':<8}{'sklearn ms':>12}{'packed ms':>12}{'speedup':>9}")
+    forest_ms = single_row_ms(forest.predict_proba, X[:single_rows])
+    packed_ms = single_row_ms(packed.predict_proba, X[:single_rows])
+    print(f'{1:<8}{forest_ms:12.3f}{packed_ms:12.3f}{forest_ms / packed_ms:9.1f}')
+    print(f'{batch_rows:<8}{forest_s * 1000:12.1f}{packed_s * 1000:12.1f}{forest_s / packed_s:9.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 300)
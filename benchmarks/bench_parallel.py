@@ -0,0 +1,27 @@
+"""Scaling of process_reports(workers=N) over a batch of in-memory reports
+
+Usage: python benchmarks/bench_parallel.py [n_reports]
+"""
+import multiprocessing
+import sys
+
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def main(n):
+    reports = make_reports(n)
+    extractor = CreditBureauFeatureExtractor()
+    print(f'{n} reports, {multiprocessing.cpu_count()} CPUs')
+    print(f"{'workers':>8}{'seconds':>10}{'reports/s':>12}{'speedup':>9}")
+    baseline, expected = timeit(extractor.process_reports, reports, repeat=1)
+    for workers in (1, 2, 4, 8, 16):
+        seconds, df = timeit(extractor.process_reports, reports, workers=workers, repeat=1)
+        pd.testing.assert_frame_equal(df, expected)
+        print(f'{workers:>8}{seconds:>10.2f}{n / seconds:>12,.0f}{baseline / seconds:>9.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
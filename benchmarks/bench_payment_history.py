@@ -0,0 +1,68 @@
+"""Payment-history tensor and features at scale
+
+Builds reports whose accounts carry random 24-month status codes (mostly
+'0' and '#', some delinquent), parses them into a PaymentHistory and times
+the payment-history features with both engines. The python engine runs on
+a subset, against which the columnar frame is checked.
+
+Usage: python benchmarks/bench_payment_history.py [n_reports] [accounts_per_report]
+"""
+import random
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from _common import load_sample_reports, timeit
+from credit_bureau_columnar import payment_history_tensor
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+FEATURES = ['worst_payment_status', 'months_delinquent', 'months_since_last_delinquency',
+            'payment_status_trend']
+CODES = ['0'] * 12 + ['#'] * 6 + ['1', '2', '3', '5', '9', '31', '36', '109', '']
+PYTHON_SUBSET = 5000
+
+
+def make_reports(n, accounts, seed=0):
+    rng = random.Random(seed)
+    extractor = CreditBureauFeatureExtractor()
+    template = load_sample_reports()[0]['data']['consumerfullcredit']
+    reports = []
+    for i in range(n):
+        history = [
+            {key: rng.choice(CODES) for key in extractor.PAYMENT_STATUS_KEYS}
+            for _ in range(rng.randint(0, 2 * accounts))
+        ]
+        consumer = dict(template, accountmonthlypaymenthistory=history)
+        reports.append({'application_id': i, 'data': {'consumerfullcredit': consumer}})
+    return reports
+
+
+def main(n, accounts):
+    reports = make_reports(n, accounts)
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+
+    parse_s, history = timeit(payment_history_tensor, reports, extractor)
+    n_accounts = len(history.status)
+    size_mb = (history.status.nbytes + history.offsets.nbytes + history.months.nbytes) / 1e6
+    print(f'{n} reports, {n_accounts:,} accounts, tensor {size_mb:.1f} MB')
+    print(f'parse             {parse_s:7.2f} s  {n_accounts / parse_s / 1e6:5.2f} M accounts/s')
+
+    columnar_s, _ = timeit(extractor.process_reports, reports, engine='columnar', as_of=as_of,
+                           features=FEATURES)
+    print(f'columnar features {columnar_s:7.2f} s')
+
+    subset = reports[:PYTHON_SUBSET]
+    python_s, expected = timeit(extractor.process_reports, subset, as_of=as_of,
+                                features=FEATURES, repeat=1)
+    subset_s, df = timeit(extractor.process_reports, subset, engine='columnar', as_of=as_of,
+                          features=FEATURES)
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    print(f'first {len(subset)} reports: python {python_s:.2f} s, columnar {subset_s:.2f} s '
+          f'({python_s / subset_s:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,97 @@
+"""Compiled lookup-table preprocessing vs the pipeline's ColumnTransformer
+
+Compiles the saved pipeline's preprocessor with
+CompiledPreprocessor.from_column_transformer and times one applicant
+record at a time (median over the applicants from GermanCredit.csv, some
+values blanked out) through the ColumnTransformer, with and without
+building its one-row DataFrame, and through CompiledPreprocessor.transform;
+then one batch of all of them. Every feature row must be identical, and
+both must reject records that lack a column (an empty record, a
+misspelled key) with ValueError rather than impute them.
+
+Usage: python benchmarks/bench_preprocessor.py [n_records]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from _common import REPO_ROOT, timeit
+from credit_risk_compiled import CompiledPreprocessor
+from credit_risk_scorer import CreditRiskScorer
+
+DATA_PATH = os.path.join(REPO_ROOT, 'GermanCredit.csv')
+
+
+def applicants(n, blank=0.05, seed=0):
+    rng = random.Random(seed)
+    records = pd.read_csv(DATA_PATH).drop(
+        columns=['Unnamed: 0', 'default', 'telephone']).to_dict('records')
+    records = [dict(records[i % len(records)]) for i in range(n)]
+    for record in records:
+        for column in record:
+            if rng.random() < blank:
+                record[column] = rng.choice([None, '', ' '])
+    return records
+
+
+def incomplete(record):
+    """Records the preprocessors must reject: empty, and one key misspelled"""
+    misspelled = dict(record)
+    misspelled['ammount'] = misspelled.pop('amount')
+    return [{}, misspelled]
+
+
+def rejects(transform, record):
+    try:
+        transform(record)
+    except ValueError:
+        return True
+    return False
+
+
+def median_us(transform, inputs):
+    seconds = []
+    for item in inputs:
+        start = time.perf_counter()
+        transform(item)
+        seconds.append(time.perf_counter() - start)
+    return np.median(seconds) * 1e6
+
+
+def main(n):
+    scorer = CreditRiskScorer()
+    preprocessor = scorer.model.named_steps['preprocessor']
+    compile_s, compiled = timeit(CompiledPreprocessor.from_column_transformer, preprocessor, repeat=1)
+    records = applicants(n)
+    frames = [scorer.frame(record) for record in records]
+    print(f'{n} records, {compiled.n_features} features, compiled in {compile_s * 1000:.1f} ms')
+
+    single = min(n, 1000)
+    expected = preprocessor.transform(scorer.frame(records)).toarray()
+    assert np.array_equal(compiled.transform(records), expected)
+    assert all(np.array_equal(compiled.transform(record), expected[i:i + 1])
+               for i, record in enumerate(records[:single]))
+    for record in incomplete(records[0]):
+        assert rejects(compiled.transform, record), record
+        assert rejects(lambda r: preprocessor.transform(scorer.frame(r)), record), record
+
+    frame_us = median_us(lambda r: preprocessor.transform(scorer.frame(r)), records[:single])
+    transform_us = median_us(preprocessor.transform, frames[:single])
+    compiled_us = median_us(compiled.transform, records[:single])
+    print(f"{'per row':<32}{'us':>10}{'speedup':>9}")
+    print(f"{'frame + ColumnTransformer':<32}{frame_us:10.1f}{frame_us / compiled_us:9.1f}")
+    print(f"{'ColumnTransformer (prebuilt)':<32}{transform_us:10.1f}{transform_us / compiled_us:9.1f}")
+    print(f"{'CompiledPreprocessor':<32}{compiled_us:10.1f}")
+
+    frame_s, _ = timeit(lambda: preprocessor.transform(scorer.frame(records)))
+    compiled_s, _ = timeit(compiled.transform, records)
+    print(f'batch of {n}: frame + ColumnTransformer {frame_s * 1000:.1f} ms, '
+          f'CompiledPreprocessor {compiled_s * 1000:.1f} ms ({frame_s / compiled_s:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
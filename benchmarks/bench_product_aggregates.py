@@ -0,0 +1,42 @@
+"""Per-product agreement aggregates: per-agreement cost of both engines
+
+Times the product_aggregates features (wide, per product type) with the
+python engine, which classifies every agreement, and the columnar engine,
+which codes each distinct category string once and groups with bincount,
+next to the two-count credit_agreements section for reference.
+
+Usage: python benchmarks/bench_product_aggregates.py [n_reports] [agreements_per_report]
+"""
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from _common import make_reports, timeit
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+
+def main(n, agreements):
+    reports = make_reports(n, agreements=agreements)
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+    selections = [
+        ('credit_agreements', list(extractor.SECTIONS['credit_agreements']['features'])),
+        ('product_aggregates', list(extractor.SECTIONS['product_aggregates']['features'])),
+    ]
+    total = n * agreements
+    print(f'{n} reports x {agreements} agreements')
+    print(f"{'section':<20}{'features':>9}{'python us/agr':>15}{'columnar us/agr':>17}{'speedup':>9}")
+    for name, features in selections:
+        python_s, expected = timeit(extractor.process_reports, reports, as_of=as_of,
+                                    features=features)
+        columnar_s, df = timeit(extractor.process_reports, reports, engine='columnar',
+                                as_of=as_of, features=features)
+        pd.testing.assert_frame_equal(df, expected, check_exact=True)
+        print(f'{name:<20}{len(features):9}{python_s / total * 1e6:15.2f}'
+              f'{columnar_s / total * 1e6:17.2f}{python_s / columnar_s:9.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,86 @@
+"""Single-applicant scoring latency: per-call joblib.load vs a resident scorer
+
+Scores applicants from GermanCredit.csv one request at a time with the
+notebook's score_new_customer (loads the pipeline on every call), with
+CreditRiskScorer.score in process and through its HTTP endpoint (one
+keep-alive connection), and reports p50/p95/p99 latency. The scorer's
+one-off load time is reported separately.
+
+Usage: python benchmarks/bench_scoring.py [n_requests]
+"""
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from _common import REPO_ROOT
+from credit_risk_scorer import DEFAULT_MODEL_PATH, CreditRiskScorer, make_server
+
+DATA_PATH = os.path.join(REPO_ROOT, 'GermanCredit.csv')
+
+
+def score_new_customer(new_data):
+    """The notebook's scoring function, kept as the reference"""
+    model = joblib.load(DEFAULT_MODEL_PATH)
+    new_data.replace(r'^\s*$', pd.NA, regex=True, inplace=True)
+    return model.predict_proba(new_data)[:, 1]
+
+
+def applicants(n):
+    records = pd.read_csv(DATA_PATH).drop(
+        columns=['Unnamed: 0', 'default', 'telephone']).to_dict('records')
+    return [records[i % len(records)] for i in range(n)]
+
+
+def latencies(score, records):
+    seconds = []
+    results = []
+    for record in records:
+        start = time.perf_counter()
+        results.append(score(record))
+        seconds.append(time.perf_counter() - start)
+    return np.array(seconds) * 1000, np.array(results, dtype=np.float64)
+
+
+def http_score(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+
+    def score(record):
+        connection.request('POST', '/score', json.dumps([record]).encode(),
+                           {'Content-Type': 'application/json'})
+        return json.loads(connection.getresponse().read())['scores'][0]
+    return score
+
+
+def main(n):
+    records = applicants(n)
+    scorer = CreditRiskScorer()
+    server = make_server(scorer, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    modes = [
+        ('score_new_customer', lambda r: score_new_customer(pd.DataFrame([r]))[0]),
+        ('CreditRiskScorer.score', lambda r: scorer.score(r)[0]),
+        ('HTTP /score', http_score(server.server_port)),
+    ]
+    print(f'{n} single-applicant requests; scorer load {scorer.load_seconds * 1000:.1f} ms (once)')
+    print(f"{'mode':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    expected = None
+    for name, score in modes:
+        ms, scores = latencies(score, records)
+        if expected is None:
+            expected = scores
+        assert np.array_equal(scores, expected), name
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f'{name:<24}{p50:9.2f}{p95:9.2f}{p99:9.2f}')
+    server.shutdown()
+    print(scorer.stats())
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
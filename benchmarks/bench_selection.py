@@ -0,0 +1,47 @@
+"""Latency of a 3-feature selection vs the full feature set
+
+Per-report extract_features latency (median over the synthetic reports)
+and batch process_reports time for both engines.
+
+Usage: python benchmarks/bench_selection.py [n_reports]
+"""
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from _common import make_reports, timeit
+from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+
+SELECTION = ['total_arrears', 'total_recent_enquiries', 'max_months_in_arrears']
+
+
+def latencies_us(extractor, reports, as_of, features):
+    samples = []
+    for report in reports:
+        start = time.perf_counter()
+        extractor.extract_features(report, as_of, features=features)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), statistics.quantiles(samples, n=100)[98]
+
+
+def main(n):
+    reports = make_reports(n)
+    extractor = CreditBureauFeatureExtractor()
+    as_of = datetime.now()
+    print(f'{n} reports; selection {SELECTION}')
+    print(f"{'':22}{'full':>10}{'3 features':>12}{'speedup':>9}")
+    full = latencies_us(extractor, reports, as_of, None)
+    selected = latencies_us(extractor, reports, as_of, SELECTION)
+    print(f"{'report p50 (us)':22}{full[0]:10.1f}{selected[0]:12.1f}{full[0] / selected[0]:9.1f}")
+    print(f"{'report p99 (us)':22}{full[1]:10.1f}{selected[1]:12.1f}{full[1] / selected[1]:9.1f}")
+    for engine in ('python', 'columnar'):
+        full_s, _ = timeit(extractor.process_reports, reports, engine=engine, as_of=as_of)
+        selected_s, _ = timeit(extractor.process_reports, reports, engine=engine, as_of=as_of,
+                               features=SELECTION)
+        print(f"{'batch ' + engine + ' (s)':22}{full_s:10.3f}{selected_s:12.3f}"
+              f"{full_s / selected_s:9.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
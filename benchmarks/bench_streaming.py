@@ -0,0 +1,53 @@
+"""Peak RSS and throughput of streaming ingestion vs json.load + process_reports
+
+Usage: python benchmarks/bench_streaming.py [n_reports]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import peak_rss_mb, write_reports
+
+
+def run_child(mode, path):
+    from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+    extractor = CreditBureauFeatureExtractor()
+    start = time.perf_counter()
+    if mode == 'json.load':
+        with open(path) as f:
+            df = extractor.process_reports(json.load(f))
+    else:
+        df = extractor.process_file(path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'reports': len(df), 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            'array': os.path.join(tmp, 'reports.json'),
+            'jsonl': os.path.join(tmp, 'reports.jsonl'),
+        }
+        write_reports(paths['array'], n)
+        write_reports(paths['jsonl'], n, jsonl=True)
+        size_mb = os.path.getsize(paths['array']) / 1e6
+        print(f'{n} reports, {size_mb:.1f} MB')
+        print(f"{'mode':<22}{'reports/s':>12}{'peak RSS MB':>14}")
+        for mode, path in [('json.load', paths['array']),
+                           ('stream (array)', paths['array']),
+                           ('stream (jsonl)', paths['jsonl'])]:
+            out = subprocess.run([sys.executable, __file__, '--child', mode, path],
+                                 check=True, capture_output=True, text=True).stdout
+            stats = json.loads(out)
+            rate = stats['reports'] / stats['seconds']
+            print(f"{mode:<22}{rate:>12,.0f}{stats['peak_rss_mb']:>14,.1f}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        run_child(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
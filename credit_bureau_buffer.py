@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_BLOCK_SIZE = 1024
+# Column kinds, narrowest first; a column only ever widens
+_KINDS = (np.int64, np.float64, object)
+
+
+def _block_kind(values):
+    """Index into _KINDS of the narrowest kind holding values like pandas would"""
+    types = set(map(type, values))
+    if types <= {int}:
+        return 0
+    if types <= {int, float}:
+        return 1
+    return 2
+
+
+class _Column:
+    """One feature column, grown geometrically"""
+
+    def __init__(self, capacity, start):
+        if start:
+            # Rows before the column's first value were missing: NaN, like pandas
+            self.kind = 1
+            self.values = np.full(capacity, np.nan)
+        else:
+            self.kind = 0
+            self.values = np.empty(capacity, dtype=np.int64)
+
+    def write(self, start, values, capacity):
+        kind = _block_kind(values)
+        if kind == 0:
+            try:
+                block = np.array(values, dtype=np.int64)
+            except OverflowError:
+                kind = 2
+        if kind == 1:
+            block = np.array(values, dtype=np.float64)
+            with np.errstate(invalid='ignore'):
+                huge = len(block) and np.nanmax(np.abs(block), initial=0) >= 2 ** 63
+            if huge and any(type(v) is int and not -2 ** 63 <= v < 2 ** 63 for v in values):
+                kind = 2  # pandas keeps ints beyond int64 as objects
+        if kind == 2:
+            block = np.empty(len(values), dtype=object)
+            block[:] = values
+        if kind > self.kind or len(self.values) < capacity:
+            widened = np.empty(capacity, dtype=_KINDS[max(kind, self.kind)])
+            widened[:start] = self.values[:start]
+            self.values = widened
+            self.kind = max(kind, self.kind)
+        self.values[start:start + len(values)] = block
+
+    def finish(self, n):
+        """Column of n rows with the dtype pandas infers for the same values"""
+        if self.kind == 2:
+            return self.values[:n].tolist()  # same inference as pd.DataFrame(rows)
+        return self.values[:n]
+
+
+class FeatureMatrix:
+    """Model-ready features: a C-contiguous float32 (rows, features) matrix
+
+    columns names the matrix columns and index holds the application_id of
+    each row.
+    """
+
+    def __init__(self, values, columns, index):
+        self.values = values
+        self.columns = columns
+        self.index = index
+
+    def __len__(self):
+        return len(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+
+def encode_column(values, codes=None):
+    """Float values of one feature column
+
+    Numeric arrays pass through. Otherwise categories are looked up in
+    `codes` ({category: float}) when given, and values are converted
+    with pd.to_numeric; anything unknown or non-numeric becomes NaN.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'biuf':
+        return values
+    values = pd.Series(values, copy=False)
+    if codes is not None:
+        values = values.map(codes)
+    elif values.dtype.kind not in 'biuf':
+        values = pd.to_numeric(values, errors='coerce')
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def feature_matrix(columns, names, index, category_codes=None):
+    """FeatureMatrix of {name: values} columns in the order of `names`
+
+    Features absent from `columns` (no report had them) are all NaN.
+    """
+    category_codes = category_codes or {}
+    values = np.full((len(index), len(names)), np.nan, dtype=np.float32)
+    for j, name in enumerate(names):
+        if name in columns:
+            values[:, j] = encode_column(columns[name], category_codes.get(name))
+    return FeatureMatrix(values, np.array(names, dtype=object), np.asarray(index))
+
+
+class FeatureBuffer:
+    """Column-oriented store of feature rows, built into a DataFrame without copying
+
+    Rows are staged in blocks of block_size dicts; each full block is
+    written into one NumPy array per feature (grown geometrically), int64
+    until a block brings floats (float64) or anything else (object), and
+    the rows are dropped. to_frame() gives the same frame as
+    pd.DataFrame(rows).set_index('application_id'), numeric columns being
+    views of the buffers.
+    """
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._size = 0
+        self._capacity = 0
+        self._columns = {}
+        self._block = []
+
+    def __len__(self):
+        return self._size + len(self._block)
+
+    def append(self, row):
+        """Stage one {feature: value} row"""
+        self._block.append(row)
+        if len(self._block) == self.block_size:
+            self._flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def _flush(self):
+        block, self._block = self._block, []
+        if not block:
+            return
+        start = self._size
+        self._size += len(block)
+        if self._size > self._capacity:
+            self._capacity = max(self._size, 2 * self._capacity)
+        names = dict.fromkeys(self._columns)
+        for row in block:
+            if len(row) != len(names) or row.keys() != names.keys():
+                names.update(dict.fromkeys(row))
+        for name in names:
+            column = self._columns.get(name)
+            if column is None:
+                column = self._columns[name] = _Column(self._capacity, start)
+            column.write(start, [row.get(name, np.nan) for row in block], self._capacity)
+
+    def to_matrix(self, names, category_codes=None, index='application_id'):
+        """FeatureMatrix of the `names` columns, skipping the DataFrame"""
+        self._flush()
+        columns = {name: column.values[:self._size] for name, column in self._columns.items()}
+        return feature_matrix(columns, names, columns.pop(index, np.zeros(0)), category_codes)
+
+    def to_frame(self, index='application_id'):
+        """DataFrame of the rows, indexed by the `index` column"""
+        self._flush()
+        frame = pd.DataFrame({name: column.finish(self._size)
+                              for name, column in self._columns.items()}, copy=False)
+        return frame.set_index(index)
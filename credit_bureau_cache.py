@@ -0,0 +1,179 @@
+import io
+import json
+import pickle
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from hashlib import sha256
+
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_RESOLUTION = timedelta(days=1)
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def _digest(prefix, payload):
+    """16 byte SHA-256 digest of prefix + a pickle of payload
+
+    The pickler runs without a memo, so the bytes depend only on content
+    (not on which sub-objects happen to be shared); this is several times
+    cheaper than canonical JSON.
+    """
+    buf = io.BytesIO()
+    buf.write(prefix)
+    pickler = pickle.Pickler(buf, protocol=5)
+    pickler.fast = True
+    pickler.dump(payload)
+    return sha256(buf.getbuffer()).digest()[:16]
+
+
+class FeatureCache:
+    """Size-bounded LRU store of extracted feature rows, kept in SQLite
+
+    Rows are keyed by a hash of the report sections the extractor reads,
+    the extractor class and version and the `as_of` bucket, so re-pulled
+    reports whose content did not change are served without extraction. The application_id is not
+    part of the key; it is re-attached to cached rows by the caller.
+    """
+
+    def __init__(self, path=':memory:', max_entries=DEFAULT_MAX_ENTRIES,
+                 resolution=DEFAULT_RESOLUTION):
+        self.path = path
+        self.max_entries = max_entries
+        self.resolution = resolution
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS features '
+            '(key BLOB PRIMARY KEY, row TEXT NOT NULL, used INTEGER NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS features_used ON features (used)')
+        self._size, last_used = self._conn.execute(
+            'SELECT COUNT(*), MAX(used) FROM features').fetchone()
+        self._clock = last_used or 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        self._conn.close()
+
+    def bucket(self, as_of):
+        """Floor `as_of` to the cache resolution; features are computed as of this time"""
+        return datetime.min + (as_of - datetime.min) // self.resolution * self.resolution
+
+    def key(self, extractor, report, as_of, features=None):
+        """Stable content hash of a report for an extractor, `as_of` bucket and feature selection
+
+        Only the sections read for the selected features are hashed.
+        """
+        if 'data' in report:
+            consumer = report['data'].get('consumerfullcredit', {})
+            payload = [consumer.get(key) for key in extractor.input_keys(features)]
+        else:
+            payload = None
+        selection = ','.join(sorted(features)) if features is not None else '*'
+        prefix = (f'{type(extractor).__qualname__}:{extractor.VERSION}:{as_of.isoformat()}:'
+                  f'{selection}:')
+        return _digest(prefix.encode(), payload)
+
+    def get_many(self, keys):
+        """Return {key: row} for the keys in the cache, marking them recently used"""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), _LOOKUP_BATCH):
+            batch = unique[start:start + _LOOKUP_BATCH]
+            found.update(self._conn.execute(
+                f"SELECT key, row FROM features WHERE key IN ({','.join('?' * len(batch))})",
+                batch))
+        hits = sum(key in found for key in keys)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        if found:
+            self._clock += 1
+            self._conn.executemany('UPDATE features SET used = ? WHERE key = ?',
+                                   [(self._clock, key) for key in found])
+            self._conn.commit()
+        return {key: json.loads(row) for key, row in found.items()}
+
+    def put_many(self, rows):
+        """Store {key: row} feature dicts, evicting least recently used rows past max_entries"""
+        if not rows:
+            return
+        self._clock += 1
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO features (key, row, used) VALUES (?, ?, ?)',
+            [(key, json.dumps(row, separators=(',', ':')), self._clock)
+             for key, row in rows.items()])
+        self._size = self._conn.execute('SELECT COUNT(*) FROM features').fetchone()[0]
+        excess = self._size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM features WHERE key IN '
+                '(SELECT key FROM features ORDER BY used LIMIT ?)', (excess,))
+            self._size -= excess
+            self.evictions += excess
+        self._conn.commit()
+
+    def stats(self):
+        """Hit/miss/eviction counters and the current number of entries"""
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'entries': self._size}
+
+
+class SectionMemo:
+    """Last section fingerprints and features per consumer, for incremental refreshes
+
+    Used by extract_features(memo=...) to re-run only the process_* methods
+    whose input sections changed since the consumer's previous report. Holds
+    up to max_consumers consumers, dropping the least recently seen.
+    """
+
+    def __init__(self, max_consumers=DEFAULT_MAX_ENTRIES):
+        self.max_consumers = max_consumers
+        self.computed = 0
+        self.skipped = 0
+        self._consumers = OrderedDict()
+        # One pickler reused for every fingerprint: creating one per section
+        # costs about as much as pickling the smaller sections
+        self._buf = io.BytesIO()
+        self._pickler = pickle.Pickler(self._buf, protocol=5)
+        self._pickler.fast = True
+
+    def __len__(self):
+        return len(self._consumers)
+
+    def fingerprint(self, inputs, as_of=None):
+        """Digest of a section's inputs (and as_of, for time-relative sections)"""
+        self._buf.seek(0)
+        self._buf.truncate()
+        self._pickler.dump((inputs, as_of))
+        return sha256(self._buf.getbuffer()).digest()[:16]
+
+    def get(self, consumer_id):
+        """{section: (fingerprint, features)} from the consumer's last report, or None"""
+        sections = self._consumers.get(consumer_id)
+        if sections is not None:
+            self._consumers.move_to_end(consumer_id)
+        return sections
+
+    def put(self, consumer_id, sections):
+        self._consumers[consumer_id] = sections
+        self._consumers.move_to_end(consumer_id)
+        while len(self._consumers) > self.max_consumers:
+            self._consumers.popitem(last=False)
+
+    def stats(self):
+        """Sections computed and skipped, and the fraction of section work skipped"""
+        total = self.computed + self.skipped
+        return {'computed': self.computed, 'skipped': self.skipped,
+                'skipped_fraction': self.skipped / total if total else 0.0,
+                'consumers': len(self._consumers)}
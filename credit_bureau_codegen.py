@@ -0,0 +1,90 @@
+# Generated section functions, by source: each distinct spec compiles once
+_COMPILED = {}
+# Distinct strings a generated function remembers the parse of
+MEMO_SIZE = 100000
+
+
+def _clean_lines(target, field, value, memo):
+    """Lines setting target to the clean value of the expression `value`"""
+    if not memo:
+        return [f'{target} = clean({value}, {field!r})']
+    # Remember parse_numeric's (number, kind) so that stats still count hits
+    return [
+        f'value = {value}',
+        'parsed = known.get(value) if value.__class__ is str else None',
+        'if parsed is None:',
+        '    parsed = parse(value)',
+        f'    if value.__class__ is str and len(known) < {MEMO_SIZE}:',
+        '        known[value] = parsed',
+        f'{target}, kind = parsed',
+        'if kind is not None:',
+        f'    record({field!r}, kind)',
+    ]
+
+
+def _rule_lines(local, rule, args, memo):
+    if 'sum' in rule:
+        lines = [f'{local} = 0']  # sum() starts from 0 too
+        for field in rule['sum']:
+            lines += _clean_lines('term', field, f"{args[rule['of']]}.get({field!r}, 0)", memo)
+            lines.append(f'{local} = {local} + term')
+        return lines
+    if 'value' in rule:
+        field = rule['value']
+        return _clean_lines(local, field, f"{args[rule['of']]}.get({field!r}, 0)", memo)
+    if 'any_set' in rule:
+        items = args[rule['any_set']]
+        exclude = tuple(rule.get('exclude', ()))
+        missing = tuple(rule.get('missing', ()))
+        return [
+            f'{local} = 0',
+            f'if {items}:',
+            f'    for key, value in {items}.items():',
+            f'        if key not in {exclude!r} and value not in {missing!r}:',
+            f'            {local} = 1',
+            '            break',
+        ]
+    raise ValueError(f'Unknown feature rule {rule!r}')
+
+
+def generate_source(name, inputs, spec, memo=False):
+    """Python source of the section function `name` for a feature spec
+
+    The spec maps each output feature to a rule over the section inputs
+    (consumerfullcredit keys, in the order the function takes them):
+
+        {'sum': [fields], 'of': key}   clean_numeric of each field, summed
+        {'value': field, 'of': key}    clean_numeric of one field
+        {'any_set': key, 'exclude': [keys], 'missing': [values]}
+                                       1 if an item outside `exclude` has a
+                                       value not in `missing`, else 0
+
+    Missing fields count as 0. The function takes (self, *inputs) like the
+    process_* methods and has every field lookup unrolled. With memo, the
+    parse_numeric result of up to MEMO_SIZE distinct strings is remembered
+    across calls (only right while it depends on its argument alone) and
+    values that are not plain numbers are recorded in self.stats directly.
+    """
+    args = {key: f'input{i}' for i, key in enumerate(inputs)}
+    if memo:
+        lines = ['parse = self.parse_numeric', 'record = self.stats.record']
+    else:
+        lines = ['clean = self._clean_field']
+    for i, rule in enumerate(spec.values()):
+        lines += _rule_lines(f'feature{i}', rule, args, memo)
+    lines.append('return {' + ', '.join(f'{feature!r}: feature{i}'
+                                        for i, feature in enumerate(spec)) + '}')
+    body = ''.join(f'    {line}\n' for line in lines)
+    return f"def {name}(self, {', '.join(args.values())}):\n{body}"
+
+
+def compile_section(name, inputs, spec, memo=False):
+    """Compile the section function for a feature spec (see generate_source)"""
+    source = generate_source(name, inputs, spec, memo)
+    function = _COMPILED.get(source)
+    if function is None:
+        namespace = {'known': {}}
+        exec(compile(source, f'<generated {name}>', 'exec'), namespace)
+        function = _COMPILED[source] = namespace[name]
+        function.__source__ = source
+    return function
@@ -0,0 +1,717 @@
+import operator
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from credit_bureau_buffer import feature_matrix
+from credit_bureau_dates import BIRTHDATE_FORMAT, ENQUIRY_DATE_FORMAT, parse_dates
+
+_MISSING_STRINGS = ['', '-', 'null', 'None']
+_MAX_VECTOR_WIDTH = 32
+_POWERS_OF_TEN = 10 ** np.arange(16, dtype=np.int64)
+
+
+def _object_array(values):
+    """1-D object array of values, never broadcasting nested lists"""
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _factorize(values):
+    """Factorize raw bureau values into (codes, uniques)
+
+    pandas treats None and NaN, or 1, 1.0 and True, as the same key while the
+    per-report path handles them differently (1 stays an int, 1.0 a float;
+    clean_numeric turns True into the int 1 in both engines, so a boolean
+    gives an integer result rather than a bool). Such columns fall back to
+    one code per value so every mapped result stays exact.
+    """
+    values = _object_array(values)
+    identity = np.arange(len(values)), values
+    try:
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    except TypeError:  # unhashable values such as nested dicts
+        return identity
+    if pd.api.types.infer_dtype(uniques, skipna=True) not in ('string', 'empty'):
+        return identity
+    na = pd.isna(uniques)
+    if na.any():
+        if (values[codes == na.argmax()] != None).any():  # noqa: E711 - elementwise
+            return identity
+        uniques = uniques.copy()
+        uniques[na] = None
+    return codes, uniques
+
+
+def _map_unique(values, func, dtype=object):
+    """Apply func once per distinct raw value and broadcast the results"""
+    codes, uniques = _factorize(values)
+    return np.array([func(u) for u in uniques], dtype=dtype)[codes]
+
+
+def _clean_strings(extractor, values):
+    """clean_numeric over an object array -> (float64 values, float-typed mask)
+
+    Strings made only of ASCII digits, commas and at most one dot (the bulk
+    of bureau amounts) are parsed arithmetically from their code points:
+    with at most 15 significant digits, mantissa / 10**k is exactly what
+    float() returns. Sentinels map to 0 and anything else goes through the
+    scalar clean_numeric once per distinct value.
+    """
+    n = len(values)
+    out = np.zeros(n)
+    is_float = np.zeros(n, dtype=bool)
+    is_str = np.fromiter(map(type, values), dtype=object, count=n) == str
+    text = np.array([v if type(v) is str else '' for v in values], dtype=str)
+    if text.itemsize > 4 * _MAX_VECTOR_WIDTH:
+        # A few very long strings would blow up the fixed-width array; they
+        # become a marker that is neither plain nor a sentinel instead
+        text = np.array([(v if len(v) <= _MAX_VECTOR_WIDTH else '?') if s else ''
+                         for v, s in zip(values, is_str)], dtype=str)
+
+    plain = np.zeros(n, dtype=bool)
+    sentinel = np.zeros(n, dtype=bool)
+    if n and text.itemsize:
+        chars = text.view(np.uint32).reshape(n, -1)
+        digit = (chars - ord('0')) < 10  # unsigned wrap-around rejects chars below '0'
+        dot = chars == ord('.')
+        n_digits = digit.sum(axis=1)
+        # NUL only pads (or is stripped by the regex anyway), so it is ignorable
+        plain = (is_str & (digit | dot | (chars == ord(',')) | (chars == 0)).all(axis=1)
+                 & (dot.sum(axis=1) <= 1) & (n_digits > 0) & (n_digits <= 15))
+        rows = np.flatnonzero(plain)
+        chars, digit, dot = chars[rows], digit[rows], dot[rows]
+        # Place value of each digit = number of digits to its right
+        place = np.cumsum(digit[:, ::-1], axis=1)[:, ::-1] - digit
+        mantissa = (np.where(digit, chars - ord('0'), 0) * _POWERS_OF_TEN[place]).sum(axis=1)
+        scale = (digit & (np.cumsum(dot, axis=1) > 0)).sum(axis=1)
+        out[rows] = mantissa / _POWERS_OF_TEN[scale].astype(np.float64)
+        is_float[rows] = True
+        other = np.flatnonzero(is_str & ~plain)
+        sentinel[other] = np.isin(np.strings.strip(text[other]), _MISSING_STRINGS)
+
+    rest = np.flatnonzero(~plain & ~sentinel & (values != None))  # noqa: E711 - elementwise
+    if len(rest):
+        codes, uniques = _factorize(values[rest])
+        cleaned = [extractor.clean_numeric(u) for u in uniques]
+        out[rest] = np.array(cleaned, dtype=np.float64)[codes]
+        is_float[rest] = np.array([type(c) is float for c in cleaned], dtype=bool)[codes]
+    return out, is_float
+
+
+def _mostly_repeated(values, sample_size=1000):
+    """Whether a sample of values is dominated by repeats, so deduplicating pays off"""
+    sample = values[::max(1, len(values) // sample_size)]
+    try:
+        return len(set(sample.tolist())) < len(sample) / 2
+    except TypeError:
+        return False
+
+
+def _clean(extractor, values):
+    """Bulk clean_numeric: returns (float64 values, mask of float-typed results)"""
+    if isinstance(values, (np.ndarray, pd.Series)) and values.dtype.kind in 'biuf':
+        return np.asarray(values, dtype=np.float64), np.full(len(values), values.dtype.kind == 'f')
+    values = _object_array(values)
+    if not _mostly_repeated(values):
+        return _clean_strings(extractor, values)
+    codes, uniques = _factorize(values)
+    cleaned, is_float = _clean_strings(extractor, uniques)
+    return cleaned[codes], is_float[codes]
+
+
+def clean_numeric_array(values, extractor=None):
+    """Vectorised clean_numeric for an array, Series or list of raw bureau values
+
+    Returns a float64 array with the same semantics as the scalar cleaner:
+    None, '', '-', 'null' and 'None' give 0, commas are stripped and
+    unparsable values give 0. Numeric arrays are converted directly.
+    """
+    if extractor is None:
+        from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+        extractor = CreditBureauFeatureExtractor()
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    elif not isinstance(values, np.ndarray):
+        values = list(values)
+    return _clean(extractor, values)[0]
+
+
+class _Batch:
+    """Valid reports of a batch plus the consumerfullcredit payload of those with data"""
+
+    def __init__(self, credit_reports):
+        self.reports = [
+            r for r in credit_reports if isinstance(r, dict) and 'application_id' in r
+        ]
+        self.rows = np.array([i for i, r in enumerate(self.reports) if 'data' in r], dtype=np.intp)
+        self.consumers = [
+            self.reports[i]['data'].get('consumerfullcredit', {}) for i in self.rows
+        ]
+        self._payment_history = None
+
+    def __len__(self):
+        return len(self.reports)
+
+    def payment_history(self, extractor):
+        """PaymentHistory of the consumers, parsed once for all sections reading it"""
+        if self._payment_history is None:
+            self._payment_history = _payment_history(extractor, self.consumers)
+        return self._payment_history
+
+    def section(self, key, default):
+        return [c.get(key, default) for c in self.consumers]
+
+    def numeric(self, values, is_float):
+        """Scatter per-consumer values into a report column with the per-report dtype"""
+        if len(self.rows) == len(self) and not is_float.any():
+            out = np.zeros(len(self), dtype=np.int64)
+        else:
+            out = np.full(len(self), np.nan)
+        out[self.rows] = values
+        return out
+
+    def objects(self, values):
+        """Scatter per-consumer Python objects and let pandas infer the dtype"""
+        out = [np.nan] * len(self)
+        for i, v in zip(self.rows, values):
+            out[i] = v
+        return pd.Series(out).array
+
+    def exploded(self, key, fields):
+        """Flatten a list section into (consumer index, {field: values}) with defaults"""
+        index = []
+        columns = {name: [] for name in fields}
+        for i, items in enumerate(self.section(key, [])):
+            if not items:
+                continue
+            for item in items:
+                index.append(i)
+                for name, default in fields.items():
+                    columns[name].append(item.get(name, default))
+        return np.array(index, dtype=np.intp), columns
+
+
+def _account_ratings(extractor, batch):
+    ratings = batch.section('accountrating', {})
+    features = {}
+    for name, fields in (('no_of_bad_accounts', extractor.BAD_ACCOUNT_FIELDS),
+                         ('no_of_good_accounts', extractor.GOOD_ACCOUNT_FIELDS)):
+        total = np.zeros(len(ratings))
+        is_float = np.zeros(len(ratings), dtype=bool)
+        for field in fields:  # left to right, like sum()
+            values, field_is_float = _clean(extractor, [r.get(field, 0) for r in ratings])
+            total = total + values
+            is_float |= field_is_float
+        features[name] = batch.numeric(total, is_float)
+    return features
+
+
+def _credit_summary(extractor, batch):
+    summaries = batch.section('creditaccountsummary', {})
+    features = {}
+    for name, field in (('total_outstanding_debt', 'totaloutstandingdebt'),
+                        ('total_arrears', 'amountarrear'),
+                        ('total_monthly_instalment', 'totalmonthlyinstalment'),
+                        ('total_number_of_judgements', 'totalnumberofjudgement')):
+        values, is_float = _clean(extractor, [s.get(field, 0) for s in summaries])
+        features[name] = batch.numeric(values, is_float)
+    return features
+
+
+def _window_counts(index, ages, n, windows):
+    """Per consumer, how many ages are <= each window: (n, windows) int64
+
+    Ages are clipped just outside the window range and sorted once under a
+    (consumer, age) key, so every window is one searchsorted per consumer.
+    """
+    windows = np.asarray(windows, dtype=np.int64)
+    span = windows.max() + 3
+    key = np.sort(index * span + np.clip(ages, -1, windows.max() + 1) + 1)
+    base = np.arange(n, dtype=np.int64)[:, None] * span
+    return (np.searchsorted(key, base + windows + 1, side='right')
+            - np.searchsorted(key, base, side='left'))
+
+
+def _enquiry_history(extractor, batch, as_of):
+    index = []
+    dates = []
+    subscribers = []
+    for i, history in enumerate(batch.section('enquiryhistorytop', [])):
+        if not history:
+            continue
+        for enquiry in history:
+            date = enquiry.get('daterequested') if isinstance(enquiry, dict) else None
+            if isinstance(date, str):  # anything else fails strptime
+                index.append(i)
+                dates.append(date)
+                subscriber = enquiry.get('subscribername')
+                subscribers.append(
+                    subscriber if isinstance(subscriber, str) and subscriber.strip() else None)
+
+    codes, uniques = _factorize(dates)
+    parsed = parse_dates(uniques, ENQUIRY_DATE_FORMAT)
+    # timedelta.days floors, as does timedelta64 floor division
+    with np.errstate(invalid='ignore'):
+        age_days = (np.datetime64(as_of, 'us') - parsed) // np.timedelta64(1, 'D')
+    valid = ~np.isnat(parsed)[codes]
+    index = np.array(index, dtype=np.int64)[valid]
+    ages = age_days[codes][valid]
+    n = len(batch.consumers)
+    windows = extractor.ENQUIRY_WINDOWS
+    counts = _window_counts(index, ages, n, (90,) + tuple(windows))
+
+    # Distinct subscribers: the most recent enquiry of each (consumer, subscriber)
+    subscriber_codes, names = _factorize(subscribers)
+    subscriber_codes = np.asarray(subscriber_codes, dtype=np.int64)[valid]
+    named = np.array([name is not None for name in names], dtype=bool)[subscriber_codes]
+    pairs = index[named] * len(names) + subscriber_codes[named]
+    order = np.lexsort((ages[named], pairs))
+    pairs = pairs[order]
+    first = np.ones(len(pairs), dtype=bool)
+    first[1:] = pairs[1:] != pairs[:-1]
+    distinct = _window_counts(pairs[first] // max(len(names), 1), ages[named][order][first], n,
+                              windows)
+
+    no_float = np.zeros(0, dtype=bool)
+    features = {'total_recent_enquiries': batch.numeric(counts[:, 0], no_float)}
+    for w, window in enumerate(windows):
+        features[f'enquiries_{window}d'] = batch.numeric(counts[:, w + 1], no_float)
+    for w, window in enumerate(windows):
+        features[f'distinct_subscribers_{window}d'] = batch.numeric(distinct[:, w], no_float)
+    return features
+
+
+def _credit_agreements(extractor, batch):
+    n = len(batch.consumers)
+    index, raw = batch.exploded('creditagreementsummary', {
+        'indicatordescription': '', 'accountstatus': None,
+        'amountoverdue': 0, 'loanduration': 0,
+    })
+    no_float = np.zeros(0, dtype=bool)
+
+    desc = _map_unique(raw['indicatordescription'], lambda d: str(d).lower())
+    personal = _map_unique(desc, lambda d: 'personal' in d, dtype=bool)
+    overdraft = _map_unique(desc, lambda d: 'overdraft' in d, dtype=bool)
+    written_off = _map_unique(raw['accountstatus'], lambda s: s == 'WrittenOff', dtype=bool)
+
+    # Running max keeps the first value reaching the maximum, so its type
+    # (int vs float) decides the dtype of the per-report result
+    overdue, overdue_is_float = _clean(extractor, raw['amountoverdue'])
+    positive = overdue > 0
+    max_overdue = np.zeros(n)
+    np.maximum.at(max_overdue, index[positive], overdue[positive])
+    hit = np.flatnonzero(positive & (overdue == max_overdue[index]))
+    first_rows, first = np.unique(index[hit], return_index=True)
+    max_is_float = np.zeros(n, dtype=bool)
+    max_is_float[first_rows] = overdue_is_float[hit[first]]
+
+    duration, _ = _clean(extractor, raw['loanduration'])
+    valid = duration > 0
+    total_duration = np.bincount(index[valid], weights=duration[valid], minlength=n)
+    valid_durations = np.bincount(index[valid], minlength=n)
+    avg_duration = np.divide(total_duration, valid_durations,
+                             out=np.zeros(n), where=valid_durations > 0)
+
+    return {
+        'personal_loan_count': batch.numeric(np.bincount(index[personal], minlength=n), no_float),
+        'overdraft_count': batch.numeric(np.bincount(index[overdraft], minlength=n), no_float),
+        'max_amount_overdue': batch.numeric(max_overdue, max_is_float),
+        'avg_loan_duration_days': batch.numeric(avg_duration, valid_durations > 0),
+        'written_off_accounts': batch.numeric(np.bincount(index[written_off], minlength=n), no_float),
+    }
+
+
+def _product_aggregates(extractor, batch):
+    n = len(batch.consumers)
+    products = extractor.PRODUCT_TYPES
+    index, raw = batch.exploded('creditagreementsummary', dict(
+        {'indicatordescription': '', 'accountstatus': None, 'performancestatus': None,
+         'repaymentfrequency': None, 'subscribername': None},
+        **{field: 0 for field, _ in extractor.PRODUCT_AMOUNTS}))
+    no_float = np.zeros(0, dtype=bool)
+
+    # Categories become integer codes with one call per distinct string
+    codes = {product: code for code, product in enumerate(products)}
+    product = _map_unique(raw['indicatordescription'],
+                          lambda d: codes[extractor.product_type(d)], dtype=np.intp)
+    group = index * len(products) + product
+    size = n * len(products)
+
+    def category_is(field, test):
+        return _map_unique(raw[field], lambda v: test(extractor.normalise_category(v)), dtype=bool)
+
+    def per_product(weights=None):
+        return np.bincount(group, weights=weights, minlength=size).reshape(n, len(products))
+
+    accounts = per_product()
+    open_accounts = per_product(category_is('accountstatus', lambda s: s == 'open'))
+    amounts = {}
+    for field, suffix in extractor.PRODUCT_AMOUNTS:
+        values, is_float = _clean(extractor, raw[field])
+        amounts[suffix] = per_product(values), per_product(is_float) > 0
+
+    features = {}
+    for p, name in enumerate(products):
+        features[f'{name}_accounts'] = batch.numeric(accounts[:, p], no_float)
+        features[f'open_{name}_accounts'] = batch.numeric(open_accounts[:, p].astype(np.int64),
+                                                          no_float)
+        for suffix, (sums, is_float) in amounts.items():
+            features[f'{name}_{suffix}'] = batch.numeric(sums[:, p], is_float[:, p])
+
+    non_performing = category_is('performancestatus', lambda s: s not in (None, 'performing'))
+    monthly = category_is('repaymentfrequency', lambda s: s == 'monthly')
+    lenders, names = _factorize([
+        v if isinstance(v, str) and v.strip() else None for v in raw['subscribername']
+    ])
+    named = np.array([name is not None for name in names], dtype=bool)[lenders]
+    pairs = np.unique(index[named] * len(names) + np.asarray(lenders)[named])
+    features['non_performing_accounts'] = batch.numeric(
+        np.bincount(index[non_performing], minlength=n), no_float)
+    features['monthly_repayment_accounts'] = batch.numeric(
+        np.bincount(index[monthly], minlength=n), no_float)
+    features['distinct_lenders'] = batch.numeric(
+        np.bincount(pairs // max(len(names), 1), minlength=n), no_float)
+    return features
+
+
+def lender_exposure(index, lenders, balances, n):
+    """Grouped lender concentration of balances for n consumers
+
+    index (consumer of each agreement), lenders (integer lender codes) and
+    balances are aligned arrays of agreements with a positive balance, in
+    report order. Returns (lenders with balance, top lender share,
+    Herfindahl index) per consumer, NaN for the shares of consumers without
+    agreements. (consumer, lender) groups are formed by hashing, so this is
+    linear in the number of agreements; groups are numbered in order of
+    first appearance, which fixes the summation order.
+    """
+    index = np.asarray(index, dtype=np.int64)
+    lenders = np.asarray(lenders, dtype=np.int64)
+    n_lenders = int(lenders.max()) + 1 if len(lenders) else 1
+    group, keys = pd.factorize(index * n_lenders + lenders)
+    group_sum = np.bincount(group, weights=balances, minlength=len(keys))
+    owner = keys // n_lenders
+    total = np.bincount(index, weights=balances, minlength=n)
+    count = np.bincount(owner, minlength=n)
+    top = np.zeros(n)
+    np.maximum.at(top, owner, group_sum)
+    share = group_sum / total[owner]
+    hhi = np.bincount(owner, weights=share * share, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        top_share = np.where(count > 0, top / total, np.nan)
+    return count, top_share, np.where(count > 0, hhi, np.nan)
+
+
+def _lender_exposure(extractor, batch):
+    index, raw = batch.exploded('creditagreementsummary',
+                                {'subscribername': None, 'currentbalanceamt': 0})
+    balances, _ = _clean(extractor, raw['currentbalanceamt'])
+    lenders, names = _factorize([
+        v if isinstance(v, str) and v.strip() else None for v in raw['subscribername']
+    ])
+    named = np.array([name is not None for name in names], dtype=bool)[lenders]
+    keep = named & (balances > 0)
+    count, top_share, hhi = lender_exposure(index[keep], np.asarray(lenders)[keep],
+                                            balances[keep], len(batch.consumers))
+    has_balance = count > 0
+    return {
+        'lenders_with_balance': batch.numeric(count, np.zeros(0, dtype=bool)),
+        'top_lender_balance_share': batch.objects(
+            np.where(has_balance, top_share, None).tolist()),
+        'lender_balance_hhi': batch.objects(np.where(has_balance, hhi, None).tolist()),
+    }
+
+
+def _delinquency(extractor, batch):
+    months, is_float = _clean(extractor, [
+        d.get('monthsinarrears', 0) if d else 0
+        for d in batch.section('deliquencyinformation', {})
+    ])
+    return {'max_months_in_arrears': batch.numeric(months, is_float)}
+
+
+def _personal_details(extractor, batch, as_of):
+    details = batch.section('personaldetailssummary', {})
+    codes, uniques = _factorize([p.get('birthdate') for p in details])
+    birthdates = parse_dates(uniques, BIRTHDATE_FORMAT)
+    today = as_of
+    year = birthdates.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = birthdates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    day = (birthdates.astype('datetime64[D]')
+           - birthdates.astype('datetime64[M]')).astype(np.int64) + 1
+    before_birthday = (today.month < month) | ((today.month == month) & (today.day < day))
+    unique_ages = (today.year - year - before_birthday).astype(object)
+    unique_ages[np.isnat(birthdates)] = None
+    ages = unique_ages[codes]
+    return {
+        'age': batch.objects(ages),
+        'property_owned': batch.numeric(
+            np.array([1 if p.get('propertyownedtype') else 0 for p in details]),
+            np.zeros(0, dtype=bool)),
+        'employment_status': batch.objects(
+            ['Employed' if p.get('employerdetail') else 'Unknown' for p in details]),
+    }
+
+
+def _guarantor_info(extractor, batch):
+    counts, is_float = _clean(extractor, [
+        g.get('accounts', 0) for g in batch.section('guarantorcount', {})
+    ])
+    has_guarantor = [
+        extractor.process_guarantor_info(g, {})['has_guarantor']
+        for g in batch.section('guarantordetails', {})
+    ]
+    return {
+        'guarantor_count': batch.numeric(counts, is_float),
+        'has_guarantor': batch.numeric(np.array(has_guarantor, dtype=np.int64),
+                                       np.zeros(0, dtype=bool)),
+    }
+
+
+class PaymentHistory:
+    """24-month payment statuses of every account in a batch of reports
+
+    status is an int16 (accounts, 24) array, column 0 being m01 (the most
+    recent month), with MISSING_STATUS for '#', blank and non-numeric codes.
+    The accounts of report i are status[offsets[i]:offsets[i + 1]], and
+    months[i] holds the calendar month (year * 12 + month - 1) of each
+    column from the report's header, -1 where the header lacks it.
+    """
+
+    MISSING_STATUS = -1
+
+    def __init__(self, status, offsets, months):
+        self.status = status
+        self.offsets = offsets
+        self.months = months
+
+    def __len__(self):
+        return len(self.months)
+
+    @property
+    def report_index(self):
+        """Report of each account"""
+        return np.repeat(np.arange(len(self), dtype=np.intp), np.diff(self.offsets))
+
+    def account_months(self):
+        """Calendar month of each status cell, shaped like status"""
+        return self.months[self.report_index]
+
+    def segments(self):
+        """(reports with accounts, offset of their first account) for ufunc.reduceat
+
+        The accounts of these reports form contiguous non-empty segments,
+        which is what reduceat needs; the other reports have no accounts.
+        """
+        rows = np.flatnonzero(np.diff(self.offsets) > 0)
+        return rows, self.offsets[rows]
+
+    def _prefix_counts(self, exceeds, windows):
+        windows = np.asarray(windows, dtype=np.intp)
+        if ((windows < 1) | (windows > self.status.shape[1])).any():
+            raise ValueError(f'Windows must be between 1 and {self.status.shape[1]} months')
+        # One prefix sum over the months answers every window
+        return np.cumsum(exceeds, axis=-1, dtype=np.int16)[..., windows - 1]
+
+    def _exceeds(self, thresholds):
+        thresholds = np.asarray(thresholds, dtype=self.status.dtype)
+        return self.status[:, None, :] >= thresholds[None, :, None]
+
+    def window_counts(self, windows, thresholds):
+        """Months at or above each status threshold in each window, per account
+
+        Returns an int16 (accounts, thresholds, windows) array; a window of w
+        months covers m01..m{w}.
+        """
+        return self._prefix_counts(self._exceeds(thresholds), windows)
+
+    def report_window_counts(self, windows, thresholds):
+        """Months in which any account was at or above each threshold, per report and window"""
+        exceeds = self._exceeds(thresholds)
+        months = np.zeros((len(self),) + exceeds.shape[1:], dtype=bool)
+        rows, starts = self.segments()
+        if len(rows):
+            months[rows] = np.logical_or.reduceat(exceeds, starts, axis=0)
+        return self._prefix_counts(months, windows)
+
+
+def _payment_history(extractor, consumers, chunk_size=20000):
+    """Gather the payment history of each consumer into a PaymentHistory
+
+    Codes are pulled 24 at a time per account (dict.get mapped over the
+    month keys) and converted once per distinct code, a chunk of consumers
+    at a time to bound the size of the intermediate object arrays.
+    """
+    width = len(extractor.PAYMENT_STATUS_KEYS)
+    missing = PaymentHistory.MISSING_STATUS
+
+    def status(code):
+        value = extractor.payment_status(code)
+        return missing if value is None else value
+
+    def month(label):
+        value = extractor.payment_month(label)
+        return -1 if value is None else value
+
+    row = operator.itemgetter(*extractor.PAYMENT_STATUS_KEYS)
+    counts = []
+    blocks = []
+    labels = []
+    for start in range(0, len(consumers), chunk_size):
+        codes = []
+        for consumer in consumers[start:start + chunk_size]:
+            history = consumer.get('accountmonthlypaymenthistory', [])
+            count = 0
+            if history and isinstance(history, list):
+                for account in history:
+                    if isinstance(account, dict):
+                        try:
+                            codes.extend(row(account))
+                        except KeyError:
+                            codes.extend(map(account.get, extractor.PAYMENT_STATUS_KEYS))
+                        count += 1
+            counts.append(count)
+            header = consumer.get('accountmonthlypaymenthistoryheader', {})
+            if isinstance(header, dict):
+                labels.extend(map(header.get, extractor.PAYMENT_HEADER_KEYS))
+            else:
+                labels.extend([None] * width)
+        if codes:
+            blocks.append(_map_unique(codes, status, dtype=np.int16))
+    status_codes = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int16)
+    months = _map_unique(labels, month, dtype=np.int32) if labels else np.zeros(0, dtype=np.int32)
+    offsets = np.zeros(len(consumers) + 1, dtype=np.int64)
+    np.cumsum(np.array(counts, dtype=np.int64), out=offsets[1:])
+    return PaymentHistory(status_codes.reshape(-1, width), offsets, months.reshape(-1, width))
+
+
+def payment_history_tensor(credit_reports, extractor=None):
+    """Parse the accountmonthlypaymenthistory of a batch of reports
+
+    Returns a PaymentHistory with one entry per valid report (a dict with an
+    application_id), in input order; reports without data have no accounts.
+    """
+    if extractor is None:
+        from credit_bureau_feat_extractor import CreditBureauFeatureExtractor
+        extractor = CreditBureauFeatureExtractor()
+    batch = _Batch(credit_reports)
+    consumers = [r['data'].get('consumerfullcredit', {}) if 'data' in r else {}
+                 for r in batch.reports]
+    return _payment_history(extractor, consumers)
+
+
+def _payment_history_features(extractor, batch, as_of):
+    history = batch.payment_history(extractor)
+    n = len(history)
+    status = history.status
+    rows, starts = history.segments()  # reports without accounts keep the defaults
+
+    observed = status != PaymentHistory.MISSING_STATUS
+    values = np.where(observed, status, 0).astype(np.int64)
+    recent = extractor.RECENT_PAYMENT_MONTHS
+    counts = np.zeros((n, 2), dtype=np.int64)
+    sums = np.zeros((n, 2), dtype=np.int64)
+    worst = np.zeros(n, dtype=np.int64)
+    delinquent = np.zeros((n, status.shape[1]), dtype=bool)
+    if len(rows):
+        split = np.stack([observed[:, :recent].sum(axis=1), observed[:, recent:].sum(axis=1)], axis=1)
+        counts[rows] = np.add.reduceat(split, starts)
+        split = np.stack([values[:, :recent].sum(axis=1), values[:, recent:].sum(axis=1)], axis=1)
+        sums[rows] = np.add.reduceat(split, starts)
+        worst[rows] = np.maximum.reduceat(values.max(axis=1), starts)
+        delinquent[rows] = np.logical_or.reduceat(status > 0, starts)
+
+    months_delinquent = delinquent.sum(axis=1)
+    last = np.flatnonzero(months_delinquent > 0)
+    last_month = history.months[last, delinquent[last].argmax(axis=1)]
+    since = np.full(n, None, dtype=object)
+    known = last_month >= 0
+    since[last[known]] = (as_of.year * 12 + as_of.month - 1 - last_month[known]).tolist()
+
+    trend = np.full(n, None, dtype=object)
+    both = (counts > 0).all(axis=1)
+    # int / int like the per-report path: exact for sums below 2**53
+    means = sums[both] / counts[both]
+    trend[both] = (means[:, 0] - means[:, 1]).tolist()
+
+    no_float = np.zeros(0, dtype=bool)
+    return {
+        'worst_payment_status': batch.numeric(worst, no_float),
+        'months_delinquent': batch.numeric(months_delinquent, no_float),
+        'months_since_last_delinquency': batch.objects(since),
+        'payment_status_trend': batch.objects(trend),
+    }
+
+
+def _delinquency_windows(extractor, batch):
+    history = batch.payment_history(extractor)
+    windows, thresholds = extractor.DELINQUENCY_WINDOWS, extractor.DPD_THRESHOLDS
+    months = history.report_window_counts(windows, thresholds)
+    accounts = np.zeros_like(months, dtype=np.int64)
+    rows, starts = history.segments()
+    if len(rows):
+        delinquent = (history.window_counts(windows, thresholds) > 0).astype(np.int64)
+        accounts[rows] = np.add.reduceat(delinquent, starts, axis=0)
+    no_float = np.zeros(0, dtype=bool)
+    features = {}
+    for t, threshold in enumerate(thresholds):
+        for kind, counts in (('months', months), ('accounts', accounts)):
+            for w, window in enumerate(windows):
+                features[f'dpd{threshold}_{kind}_{window}m'] = batch.numeric(
+                    counts[:, t, w].astype(np.int64), no_float)
+    return features
+
+
+# Columnar counterparts of the extractor's SECTIONS
+_SECTION_FUNCTIONS = {
+    'account_ratings': _account_ratings,
+    'credit_summary': _credit_summary,
+    'enquiry_history': _enquiry_history,
+    'credit_agreements': _credit_agreements,
+    'product_aggregates': _product_aggregates,
+    'lender_exposure': _lender_exposure,
+    'delinquency': _delinquency,
+    'personal_details': _personal_details,
+    'guarantor_info': _guarantor_info,
+    'payment_history': _payment_history_features,
+    'delinquency_windows': _delinquency_windows,
+}
+
+
+def compute_features(extractor, credit_reports, as_of=None, features=None, output='frame'):
+    """Columnar equivalent of extractor.process_reports for a batch of reports
+
+    Raw fields are gathered into one array per field (list sections are
+    exploded with a per-row consumer index), cleaned once per distinct raw
+    value and reduced with NumPy, giving the same frame, dtypes included.
+    `features` selects output columns; unneeded sections are not gathered.
+    output='matrix' gives a FeatureMatrix built straight from the columns.
+    """
+    sections, keep = extractor.plan_features(features)
+    missing = [name for name in sections if name not in _SECTION_FUNCTIONS]
+    if missing:
+        raise ValueError(f'No columnar implementation for sections {missing}')
+    batch = _Batch(credit_reports)
+    application_ids = [r.get('application_id') for r in batch.reports]
+    as_of = as_of or datetime.now()
+
+    columns = {}
+    if len(batch.rows):
+        for name, section in sections.items():
+            if section.get('as_of'):
+                result = _SECTION_FUNCTIONS[name](extractor, batch, as_of)
+            else:
+                result = _SECTION_FUNCTIONS[name](extractor, batch)
+            columns.update((column, values) for column, values in result.items()
+                           if keep is None or column in keep)
+
+    if output == 'matrix':
+        return feature_matrix(columns, extractor.output_features(features),
+                              pd.Series(application_ids).to_numpy(), extractor.CATEGORY_CODES)
+    if not columns:
+        return pd.DataFrame(
+            [{'application_id': application_id} for application_id in application_ids]
+        ).set_index('application_id')
+    index = pd.Index(application_ids, name='application_id')
+    return pd.DataFrame(columns, index=index)
@@ -0,0 +1,111 @@
+from datetime import datetime
+from functools import lru_cache
+
+BIRTHDATE_FORMAT = "%d/%m/%Y"
+ENQUIRY_DATE_FORMAT = "%d/%m/%Y %H:%M:%S"
+DATE_CACHE_SIZE = 1 << 16
+
+# Zero-padded layouts that can be rearranged into ISO 8601 instead of using strptime
+_FIXED_WIDTH = {BIRTHDATE_FORMAT: 10, ENQUIRY_DATE_FORMAT: 19}
+_SEPARATORS = {2: '/', 5: '/', 10: ' ', 13: ':', 16: ':'}
+# strptime only matches strings with as many of these separators as the format
+_SEPARATOR_COUNTS = {fmt: (fmt.count('/'), fmt.count(':')) for fmt in _FIXED_WIDTH}
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_str(value, fmt):
+    width = _FIXED_WIDTH.get(fmt)
+    if (len(value) == width and value[2] == value[5] == '/'
+            and (width == 10 or (value[10] == ' ' and value[13] == value[16] == ':'))):
+        digits = value[0:2] + value[3:5] + value[6:10] + value[11:13] + value[14:16] + value[17:19]
+        if digits.isascii() and digits.isdigit():
+            try:
+                return datetime.fromisoformat(value[6:10] + '-' + value[3:5] + '-' + value[0:2] + value[10:])
+            except ValueError:  # e.g. 31/02, exactly where strptime fails too
+                return None
+    separators = _SEPARATOR_COUNTS.get(fmt)
+    if separators and separators != (value.count('/'), value.count(':')):
+        return None  # '-', 'N/A' and the like, without raising inside strptime
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
+
+
+def parse_date(value, fmt):
+    """Parse a bureau date string, returning None where strptime would fail
+
+    Results for strings are kept in a bounded LRU cache, since the same
+    birthdates and request timestamps repeat across pulls.
+    """
+    if type(value) is str:
+        return _parse_str(value, fmt)
+    return None
+
+
+def _fixed_width_dates(strings, fmt):
+    """Vectorised strptime for zero-padded 'dd/mm/yyyy[ HH:MM:SS]' strings
+
+    Returns datetime64[s] values (NaT where strptime would raise) and a mask
+    of strings not in the zero-padded layout, which strptime may still accept
+    (e.g. '6/5/1991') and must be parsed one by one.
+    """
+    import numpy as np
+
+    n = len(strings)
+    width = _FIXED_WIDTH.get(fmt)
+    if width is None or not n:
+        return np.full(n, np.datetime64('NaT'), dtype='datetime64[s]'), np.ones(n, dtype=bool)
+    text = np.array(strings, dtype=f'U{width + 1}')
+    chars = text.view(np.uint32).reshape(n, width + 1).astype(np.int64)
+    digits = chars[:, :width] - ord('0')
+
+    layout = np.zeros(width, dtype=bool)
+    shaped = (chars[:, width] == 0) & (chars[:, width - 1] != 0)
+    for pos in range(width):
+        if pos in _SEPARATORS:
+            shaped &= chars[:, pos] == ord(_SEPARATORS[pos])
+        else:
+            layout[pos] = True
+    shaped &= ((digits[:, layout] >= 0) & (digits[:, layout] <= 9)).all(axis=1)
+
+    def field(start, stop):
+        value = np.zeros(n, dtype=np.int64)
+        for pos in range(start, stop):
+            value = value * 10 + digits[:, pos]
+        return value
+
+    day, month, year = field(0, 2), field(3, 5), field(6, 10)
+    month_start = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    days_in_month = ((month_start + 1).astype('datetime64[D]')
+                     - month_start.astype('datetime64[D]')).astype(np.int64)
+    valid = (shaped & (year >= 1) & (month >= 1) & (month <= 12)
+             & (day >= 1) & (day <= days_in_month))
+    seconds = np.zeros(n, dtype=np.int64)
+    if width == 19:
+        hour, minute, second = field(11, 13), field(14, 16), field(17, 19)
+        valid &= (hour < 24) & (minute < 60) & (second < 60)
+        seconds = hour * 3600 + minute * 60 + second
+
+    dates = (month_start.astype('datetime64[D]') + (day - 1)).astype('datetime64[s]') + seconds
+    dates[~valid] = np.datetime64('NaT')
+    return dates, ~shaped
+
+
+def parse_dates(values, fmt):
+    """Parse a whole column of bureau date strings -> datetime64[us] array
+
+    Zero-padded strings are parsed arithmetically in one NumPy pass; other
+    layouts fall back to parse_date. NaT marks values strptime would reject.
+    """
+    import numpy as np
+
+    values = list(values)
+    parsed, irregular = _fixed_width_dates(
+        [v if type(v) is str else '' for v in values], fmt)
+    parsed = parsed.astype('datetime64[us]')
+    for i in np.flatnonzero(irregular):
+        date = parse_date(values[i], fmt)
+        if date is not None:
+            parsed[i] = date
+    return parsed
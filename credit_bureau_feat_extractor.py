@@ -1,79 +1,326 @@
 import json
-import pandas as pd
+from collections import deque
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import accumulate, chain, islice
 import re
+from bisect import bisect_right
+
+from credit_bureau_codegen import compile_section
+from credit_bureau_dates import BIRTHDATE_FORMAT, ENQUIRY_DATE_FORMAT, parse_date
+from credit_bureau_reader import iter_reports
+from credit_bureau_stats import COERCED, INVALID, MISSING, ValueStats
+
+DEFAULT_CHUNKSIZE = 500
+COERCE_CACHE_SIZE = 1 << 14
+_MISSING_NUMBERS = frozenset(['', '-', 'null', 'None'])
+_NON_NUMERIC = re.compile(r'[^\d.]')
+# (extractor class, section method) -> function computing the section
+_MONTH_NUMBERS = {
+    name: number for number, name in enumerate(
+        ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'], 1)
+}
+
+
+def _parse_number(value):
+    """(number, kind) of a bureau number, see CreditBureauFeatureExtractor.parse_numeric"""
+    if isinstance(value, (int, float)):
+        return (int(value) if value.__class__ is bool else value), None
+    if isinstance(value, str):
+        # Fast path: digits with thousands separators and at most one dot
+        plain = value.replace(',', '')
+        head, _, tail = plain.partition('.')
+        if (head or tail) and (not head or head.isdecimal()) and (not tail or tail.isdecimal()):
+            return float(plain), None
+    return _coerce_numeric(value)
+
+
+def _coerce_numeric(value):
+    """(number, kind) of a value that is not a plain number, see parse_numeric"""
+    if isinstance(value, str):
+        return _coerce_string(value)
+    if value is None:
+        return 0, MISSING
+    return _coerce_digits(str(value))
+
+
+@lru_cache(maxsize=COERCE_CACHE_SIZE)
+def _coerce_string(value):
+    # Placeholders and malformed strings repeat a lot; the regex is the cost
+    if value.strip() in _MISSING_NUMBERS:
+        return 0, MISSING
+    return _coerce_digits(value)
+
+
+def _coerce_digits(text):
+    digits = _NON_NUMERIC.sub('', text)
+    head, _, tail = digits.partition('.')
+    if (head or tail) and '.' not in tail:  # what float() accepts
+        return float(digits), COERCED
+    return 0, INVALID
+
+
+def _chunked(iterable, size):
+    """Yield successive lists of up to size items"""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _window_features(windows, thresholds):
+    """Names of the rolling delinquency features, per threshold: months then accounts"""
+    return tuple(f'dpd{threshold}_{kind}_{window}m' for threshold in thresholds
+                 for kind in ('months', 'accounts') for window in windows)
+
+
+def _enquiry_features(windows):
+    """Names of the enquiry window features: counts, then distinct subscribers"""
+    return (tuple(f'enquiries_{window}d' for window in windows)
+            + tuple(f'distinct_subscribers_{window}d' for window in windows))
+
+
+def _product_features(products, amounts):
+    """Names of the per-product agreement features, then the portfolio-wide ones"""
+    names = []
+    for product in products:
+        names += [f'{product}_accounts', f'open_{product}_accounts']
+        names += [f'{product}_{suffix}' for _, suffix in amounts]
+    return tuple(names) + ('non_performing_accounts', 'monthly_repayment_accounts',
+                           'distinct_lenders')
+
+
+def _extract_chunk(extractor, as_of, features, chunk):
+    """Pool task: extract features for one chunk of reports, with the value stats it recorded"""
+    stats, extractor.stats = extractor.stats, ValueStats()
+    try:
+        return list(extractor.iter_features(chunk, as_of, features=features)), extractor.stats
+    finally:
+        extractor.stats = stats
+
 
 class CreditBureauFeatureExtractor:
+    # Bump when feature definitions change; part of the feature cache key
+    VERSION = 3
+    BAD_ACCOUNT_FIELDS = [
+        'noofotheraccountsbad', 'noofretailaccountsbad', 'nooftelecomaccountsbad',
+        'noofautoloanaccountsbad', 'noofhomeloanaccountsbad', 'noofjointloanaccountsbad',
+        'noofstudyloanaccountsbad', 'noofcreditcardaccountsbad', 'noofpersonalloanaccountsbad'
+    ]
+    GOOD_ACCOUNT_FIELDS = [
+        'noofotheraccountsgood', 'noofretailaccountsgood', 'nooftelecomaccountsgood',
+        'noofautoloanccountsgood', 'noofhomeloanaccountsgood', 'noofjointloanaccountsgood',
+        'noofstudyloanaccountsgood', 'noofcreditcardaccountsgood', 'noofpersonalloanaccountsgood'
+    ]
+    # accountmonthlypaymenthistory codes per account, most recent month first,
+    # and the accountmonthlypaymenthistoryheader labels of those months
+    PAYMENT_STATUS_KEYS = [f'm{i:02d}' for i in range(1, 25)]
+    PAYMENT_HEADER_KEYS = [f'mh{i:02d}' for i in range(1, 25)]
+    RECENT_PAYMENT_MONTHS = 6
+    MAX_PAYMENT_STATUS = 32767  # statuses are held as int16
+    # Enquiry count windows in days up to as_of; subclasses changing them
+    # must also update SECTIONS
+    ENQUIRY_WINDOWS = (7, 30, 90, 180, 365)
+    # Product type of a credit agreement: the first rule whose keyword is in
+    # its lower-cased indicatordescription, else 'other'. Subclasses changing
+    # products or amounts must also update SECTIONS
+    PRODUCT_RULES = (
+        ('overdraft', 'overdraft'), ('card', 'credit_card'), ('unsecured', 'personal_loan'),
+        ('secured', 'secured_loan'), ('instal', 'instalment'), ('personal', 'personal_loan'),
+    )
+    PRODUCT_TYPES = ('personal_loan', 'secured_loan', 'overdraft', 'credit_card', 'instalment',
+                     'other')
+    # Agreement amounts summed per product: (field, feature suffix)
+    PRODUCT_AMOUNTS = (
+        ('currentbalanceamt', 'current_balance'), ('openingbalanceamt', 'opening_balance'),
+        ('instalmentamount', 'repayment'), ('amountoverdue', 'amount_overdue'),
+    )
+    # Rolling delinquency windows (months back from m01) and days-past-due
+    # thresholds; subclasses changing them must also update SECTIONS
+    DELINQUENCY_WINDOWS = (3, 6, 12, 24)
+    DPD_THRESHOLDS = (30, 60, 90)
+    # Float codes of categorical features in matrix output; other values are NaN
+    CATEGORY_CODES = {'employment_status': {'Unknown': 0.0, 'Employed': 1.0}}
+    # Feature sections in output order: the process_* method, the
+    # consumerfullcredit inputs it takes (key -> default), whether it also
+    # takes the as_of reference time and the output features it produces.
+    # Sections with 'default': False are only run when one of their features
+    # is selected. Feature selection and cache keys rely on the inputs listed
+    # here, so subclasses reading other sections must declare them. A 'spec'
+    # declares the features as credit_bureau_codegen rules (field lists may
+    # name a class attribute) and the method is the function generated from
+    # it, installed when the class is created; a subclass may define the
+    # method itself instead.
+    SECTIONS = {
+        'account_ratings': {
+            'method': 'process_account_ratings',
+            'inputs': {'accountrating': {}},
+            'features': ('no_of_bad_accounts', 'no_of_good_accounts'),
+            'spec': {
+                'no_of_bad_accounts': {'sum': 'BAD_ACCOUNT_FIELDS', 'of': 'accountrating'},
+                'no_of_good_accounts': {'sum': 'GOOD_ACCOUNT_FIELDS', 'of': 'accountrating'},
+            },
+        },
+        'credit_summary': {
+            'method': 'process_credit_summary',
+            'inputs': {'creditaccountsummary': {}},
+            'features': ('total_outstanding_debt', 'total_arrears', 'total_monthly_instalment',
+                         'total_number_of_judgements'),
+            'spec': {
+                'total_outstanding_debt': {'value': 'totaloutstandingdebt', 'of': 'creditaccountsummary'},
+                'total_arrears': {'value': 'amountarrear', 'of': 'creditaccountsummary'},
+                'total_monthly_instalment': {'value': 'totalmonthlyinstalment',
+                                             'of': 'creditaccountsummary'},
+                'total_number_of_judgements': {'value': 'totalnumberofjudgement',
+                                               'of': 'creditaccountsummary'},
+            },
+        },
+        'enquiry_history': {
+            'method': 'process_enquiry_history',
+            'inputs': {'enquiryhistorytop': []},
+            'as_of': True,
+            'features': ('total_recent_enquiries',) + _enquiry_features(ENQUIRY_WINDOWS),
+        },
+        'credit_agreements': {
+            'method': 'process_credit_agreements',
+            'inputs': {'creditagreementsummary': []},
+            'features': ('personal_loan_count', 'overdraft_count', 'max_amount_overdue',
+                         'avg_loan_duration_days', 'written_off_accounts'),
+        },
+        'product_aggregates': {
+            'method': 'process_product_aggregates',
+            'inputs': {'creditagreementsummary': []},
+            'default': False,
+            'features': _product_features(PRODUCT_TYPES, PRODUCT_AMOUNTS),
+        },
+        'lender_exposure': {
+            'method': 'process_lender_exposure',
+            'inputs': {'creditagreementsummary': []},
+            'default': False,
+            'features': ('lenders_with_balance', 'top_lender_balance_share', 'lender_balance_hhi'),
+        },
+        'delinquency': {
+            'method': 'process_delinquency',
+            'inputs': {'deliquencyinformation': {}},
+            'features': ('max_months_in_arrears',),
+        },
+        'personal_details': {
+            'method': 'process_personal_details',
+            'inputs': {'personaldetailssummary': {}},
+            'as_of': True,
+            'features': ('age', 'property_owned', 'employment_status'),
+        },
+        'guarantor_info': {
+            'method': 'process_guarantor_info',
+            'inputs': {'guarantordetails': {}, 'guarantorcount': {}},
+            'features': ('guarantor_count', 'has_guarantor'),
+            'spec': {
+                'guarantor_count': {'value': 'accounts', 'of': 'guarantorcount'},
+                'has_guarantor': {'any_set': 'guarantordetails', 'exclude': ('guarantordateofbirth',),
+                                  'missing': (None, '', 'null', '1900-01-01T00:00:00+01:00')},
+            },
+        },
+        'payment_history': {
+            'method': 'process_payment_history',
+            'inputs': {'accountmonthlypaymenthistory': [], 'accountmonthlypaymenthistoryheader': {}},
+            'as_of': True,
+            'default': False,
+            'features': ('worst_payment_status', 'months_delinquent',
+                         'months_since_last_delinquency', 'payment_status_trend'),
+        },
+        'delinquency_windows': {
+            'method': 'process_delinquency_windows',
+            'inputs': {'accountmonthlypaymenthistory': []},
+            'default': False,
+            'features': _window_features(DELINQUENCY_WINDOWS, DPD_THRESHOLDS),
+        },
+    }
+
     def __init__(self):
-        pass
+        # Missing and malformed values met while extracting, per field
+        self.stats = ValueStats()
+
+    def parse_numeric(self, value):
+        """Classify and convert a bureau number without raising -> (number, kind)
+
+        kind is None for numbers and plain numeric strings (digits, thousands
+        separators and at most one dot), else the credit_bureau_stats kind:
+        MISSING for None and empty placeholders (0), COERCED for other values
+        whose digits make a number ('R 1,200' -> 1200.0), INVALID otherwise (0).
+        Booleans are the integers 0 and 1, as in the columnar engine.
+        Subclasses may override it to parse numbers differently; the python
+        engine's sections then use the override, and count its kinds.
+        """
+        return _parse_number(value)
 
     def clean_numeric(self, value):
-        """Convert string numbers with commas to float"""
-        if value is None or isinstance(value, (int, float)):
-            return value if value is not None else 0
-        if isinstance(value, str) and value.strip() in ('', '-', 'null', 'None'):
-            return 0
-        try:
-            return float(re.sub(r'[^\d.]', '', str(value)))
-        except:
-            return 0
-
-    def calculate_age(self, birthdate_str):
-        """Calculate age from birthdate string"""
-        if not birthdate_str or birthdate_str.strip() in ('', '-'):
+        """Convert string numbers with commas to float
+
+        The number of parse_numeric; booleans become the integers 0 and 1.
+        """
+        return self._parse(value)[0]
+
+    def _clean_field(self, value, field):
+        """clean_numeric of a value read from `field`, counting it in self.stats if malformed
+
+        A subclass's clean_numeric override is called as is, without
+        counting; a parse_numeric override is used and counted.
+        """
+        if type(self).clean_numeric is not CreditBureauFeatureExtractor.clean_numeric:
+            return self.clean_numeric(value)
+        number, kind = self._parse(value)
+        if kind is not None:
+            self.stats.record(field, kind)
+        return number
+
+    def calculate_age(self, birthdate_str, as_of=None):
+        """Calculate age from birthdate string, as of `as_of` (default: now)"""
+        if birthdate_str is None or (isinstance(birthdate_str, str)
+                                     and birthdate_str.strip() in ('', '-')):
+            self.stats.record('birthdate', MISSING)
             return None
-        try:
-            birthdate = datetime.strptime(birthdate_str, "%d/%m/%Y")
-            today = datetime.today()
-            return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
-        except:
+        birthdate = parse_date(birthdate_str, BIRTHDATE_FORMAT)  # None for non-strings
+        if birthdate is None:
+            self.stats.record('birthdate', INVALID)
             return None
+        today = as_of or datetime.now()
+        return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
 
-    def process_account_ratings(self, account_rating):
-        """Extract good/bad account counts"""
-        features = {}
-        features['no_of_bad_accounts'] = sum(
-            self.clean_numeric(account_rating.get(field, 0))
-            for field in [
-                'noofotheraccountsbad', 'noofretailaccountsbad', 'nooftelecomaccountsbad',
-                'noofautoloanaccountsbad', 'noofhomeloanaccountsbad', 'noofjointloanaccountsbad',
-                'noofstudyloanaccountsbad', 'noofcreditcardaccountsbad', 'noofpersonalloanaccountsbad'
-            ]
-        )
-        features['no_of_good_accounts'] = sum(
-            self.clean_numeric(account_rating.get(field, 0))
-            for field in [
-                'noofotheraccountsgood', 'noofretailaccountsgood', 'nooftelecomaccountsgood',
-                'noofautoloanccountsgood', 'noofhomeloanaccountsgood', 'noofjointloanaccountsgood',
-                'noofstudyloanaccountsgood', 'noofcreditcardaccountsgood', 'noofpersonalloanaccountsgood'
-            ]
-        )
-        return features
-
-    def process_credit_summary(self, credit_summary):
-        """Extract debt and arrears information"""
-        features = {}
-        features['total_outstanding_debt'] = self.clean_numeric(credit_summary.get('totaloutstandingdebt', 0))
-        features['total_arrears'] = self.clean_numeric(credit_summary.get('amountarrear', 0))
-        features['total_monthly_instalment'] = self.clean_numeric(credit_summary.get('totalmonthlyinstalment', 0))
-        features['total_number_of_judgements'] = self.clean_numeric(credit_summary.get('totalnumberofjudgement', 0))
-        return features
+    def process_enquiry_history(self, enquiry_history, as_of=None):
+        """Count credit enquiries up to `as_of` (default: now) in several windows
 
-    def process_enquiry_history(self, enquiry_history):
-        """Count recent credit inquiries"""
+        Alongside the 90-day total_recent_enquiries, counts the enquiries and
+        the distinct enquiring subscribers of each of ENQUIRY_WINDOWS. Dates
+        are parsed once and sorted, so every window is a binary search.
+        """
         features = {'total_recent_enquiries': 0}
+        features.update(dict.fromkeys(_enquiry_features(self.ENQUIRY_WINDOWS), 0))
         if not enquiry_history:
             return features
-            
-        recent_count = 0
+
+        as_of = as_of or datetime.now()
+        ages = []
+        latest = {}  # subscriber -> age in days of its most recent enquiry
         for enquiry in enquiry_history:
-            try:
-                enquiry_date = datetime.strptime(enquiry['daterequested'], "%d/%m/%Y %H:%M:%S")
-                if (datetime.now() - enquiry_date).days <= 90:
-                    recent_count += 1
-            except:
+            requested = enquiry.get('daterequested') if isinstance(enquiry, dict) else None
+            enquiry_date = parse_date(requested, ENQUIRY_DATE_FORMAT)
+            if enquiry_date is None:
+                self.stats.record('daterequested', MISSING if not requested else INVALID)
                 continue
-        features['total_recent_enquiries'] = recent_count
+            age = (as_of - enquiry_date).days
+            ages.append(age)
+            subscriber = enquiry.get('subscribername')
+            if isinstance(subscriber, str) and subscriber.strip():
+                latest[subscriber] = min(age, latest.get(subscriber, age))
+        ages.sort()
+        subscriber_ages = sorted(latest.values())
+
+        features['total_recent_enquiries'] = bisect_right(ages, 90)
+        for window in self.ENQUIRY_WINDOWS:
+            features[f'enquiries_{window}d'] = bisect_right(ages, window)
+            features[f'distinct_subscribers_{window}d'] = bisect_right(subscriber_ages, window)
         return features
 
 
@@ -110,12 +357,12 @@ class CreditBureauFeatureExtractor:
                 written_off += 1
             
             # Amount overdue
-            overdue = self.clean_numeric(account.get('amountoverdue', 0))
+            overdue = self._clean_field(account.get('amountoverdue', 0), 'amountoverdue')
             if overdue > max_overdue:
                 max_overdue = overdue
             
             # Loan duration
-            duration = self.clean_numeric(account.get('loanduration', 0))
+            duration = self._clean_field(account.get('loanduration', 0), 'loanduration')
             if duration > 0:
                 total_duration += duration
                 valid_durations += 1
@@ -129,71 +376,506 @@ class CreditBureauFeatureExtractor:
         
         return features
 
+    def normalise_category(self, value):
+        """Lower-cased, stripped category string; None for blanks and non-strings"""
+        if isinstance(value, str) and value.strip():
+            return value.strip().lower()
+        return None
+
+    def product_type(self, description):
+        """Product type of an indicatordescription, per PRODUCT_RULES"""
+        desc = str(description).lower()
+        for keyword, product in self.PRODUCT_RULES:
+            if keyword in desc:
+                return product
+        return 'other'
+
+    def process_product_aggregates(self, credit_agreements):
+        """Account counts and amount totals per product type
+
+        For each of PRODUCT_TYPES: the accounts, the open accounts and the
+        sums of PRODUCT_AMOUNTS; plus non-performing and monthly-repayment
+        account counts and the number of distinct lenders.
+        """
+        features = dict.fromkeys(_product_features(self.PRODUCT_TYPES, self.PRODUCT_AMOUNTS), 0)
+        if not credit_agreements:
+            return features
+
+        lenders = set()
+        for account in credit_agreements:
+            product = self.product_type(account.get('indicatordescription', ''))
+            features[f'{product}_accounts'] += 1
+            if self.normalise_category(account.get('accountstatus')) == 'open':
+                features[f'open_{product}_accounts'] += 1
+            for field, suffix in self.PRODUCT_AMOUNTS:
+                features[f'{product}_{suffix}'] += self._clean_field(account.get(field, 0), field)
+            if self.normalise_category(account.get('performancestatus')) not in (None, 'performing'):
+                features['non_performing_accounts'] += 1
+            if self.normalise_category(account.get('repaymentfrequency')) == 'monthly':
+                features['monthly_repayment_accounts'] += 1
+            lender = account.get('subscribername')
+            if isinstance(lender, str) and lender.strip():
+                lenders.add(lender)
+        features['distinct_lenders'] = len(lenders)
+        return features
+
+    def process_lender_exposure(self, credit_agreements):
+        """Concentration of current balances across lenders (subscribername)
+
+        Counts the lenders holding a positive balance and gives the share of
+        the top lender and the Herfindahl index of the lender shares; both
+        are None without any balance. Agreements without a lender are left out.
+        """
+        features = {
+            'lenders_with_balance': 0,
+            'top_lender_balance_share': None,
+            'lender_balance_hhi': None
+        }
+        if not credit_agreements:
+            return features
+
+        balances = {}
+        total = 0
+        for account in credit_agreements:
+            lender = account.get('subscribername')
+            if not (isinstance(lender, str) and lender.strip()):
+                continue
+            balance = self._clean_field(account.get('currentbalanceamt', 0), 'currentbalanceamt')
+            if balance > 0:
+                balances[lender] = balances.get(lender, 0) + balance
+                total += balance
+        if balances:
+            features['lenders_with_balance'] = len(balances)
+            features['top_lender_balance_share'] = max(balances.values()) / total
+            features['lender_balance_hhi'] = sum(
+                (balance / total) * (balance / total) for balance in balances.values())
+        return features
+
     def process_delinquency(self, delinquency_info):
         """Extract months in arrears"""
         features = {'max_months_in_arrears': 0}
         if not delinquency_info:
             return features
             
-        months = self.clean_numeric(delinquency_info.get('monthsinarrears', 0))
+        months = self._clean_field(delinquency_info.get('monthsinarrears', 0), 'monthsinarrears')
         features['max_months_in_arrears'] = months
         return features
 
-    def process_personal_details(self, personal_details):
+    def process_personal_details(self, personal_details, as_of=None):
         """Extract demographic information"""
         features = {
-            'age': self.calculate_age(personal_details.get('birthdate')),
+            'age': self.calculate_age(personal_details.get('birthdate'), as_of),
             'property_owned': 1 if personal_details.get('propertyownedtype') else 0,
             'employment_status': 'Employed' if personal_details.get('employerdetail') else 'Unknown'
         }
         return features
 
-    def process_guarantor_info(self, guarantor_details, guarantor_count):
-        """Analyze guarantor information"""
+    def payment_status(self, code):
+        """Delinquency status of an m01..m24 code; None for '#', blanks and other non-numbers"""
+        if isinstance(code, str):
+            code = code.strip()
+            if not (code.isascii() and code.isdigit()):
+                return None
+            digits = code.lstrip('0')  # int() refuses very long digit strings
+            if len(digits) > 5:
+                return self.MAX_PAYMENT_STATUS
+            return min(int(digits or 0), self.MAX_PAYMENT_STATUS)
+        if isinstance(code, int) and not isinstance(code, bool) and code >= 0:
+            return min(code, self.MAX_PAYMENT_STATUS)
+        return None
+
+    def payment_month(self, label):
+        """Calendar month (year * 12 + month - 1) of a header label such as '2020\\nAUG', or None"""
+        if not isinstance(label, str):
+            return None
+        parts = label.split()
+        if len(parts) != 2 or not (parts[0].isascii() and parts[0].isdigit()):
+            return None
+        month = _MONTH_NUMBERS.get(parts[1].upper())
+        if month is None:
+            return None
+        return int(parts[0]) * 12 + month - 1
+
+    def process_payment_history(self, payment_history, header, as_of=None):
+        """Summarise the 24-month payment history of all accounts
+
+        Statuses above 0 are delinquent. The trend is the mean status of the
+        last RECENT_PAYMENT_MONTHS months minus that of the older months.
+        """
         features = {
-            'guarantor_count': self.clean_numeric(guarantor_count.get('accounts', 0)),
-            'has_guarantor': 0
+            'worst_payment_status': 0,
+            'months_delinquent': 0,
+            'months_since_last_delinquency': None,
+            'payment_status_trend': None
         }
-        
-        if guarantor_details:
-            for k, v in guarantor_details.items():
-                if k != 'guarantordateofbirth' and v not in (None, '', 'null', '1900-01-01T00:00:00+01:00'):
-                    features['has_guarantor'] = 1
-                    break
+        if not payment_history or not isinstance(payment_history, list):
+            return features
+
+        columns = [[] for _ in self.PAYMENT_STATUS_KEYS]
+        for account in payment_history:
+            if not isinstance(account, dict):
+                continue
+            for column, key in zip(columns, self.PAYMENT_STATUS_KEYS):
+                status = self.payment_status(account.get(key))
+                if status is not None:
+                    column.append(status)
+        observed = [status for column in columns for status in column]
+        if not observed:
+            return features
+
+        features['worst_payment_status'] = max(observed)
+        delinquent = [i for i, column in enumerate(columns) if any(s > 0 for s in column)]
+        features['months_delinquent'] = len(delinquent)
+        if delinquent and isinstance(header, dict):
+            month = self.payment_month(header.get(self.PAYMENT_HEADER_KEYS[delinquent[0]]))
+            if month is not None:
+                as_of = as_of or datetime.now()
+                features['months_since_last_delinquency'] = as_of.year * 12 + as_of.month - 1 - month
+        recent = [s for column in columns[:self.RECENT_PAYMENT_MONTHS] for s in column]
+        older = [s for column in columns[self.RECENT_PAYMENT_MONTHS:] for s in column]
+        if recent and older:
+            features['payment_status_trend'] = sum(recent) / len(recent) - sum(older) / len(older)
         return features
 
-    def extract_features(self, credit_report):
-        """Main feature extraction method"""
+    def process_delinquency_windows(self, payment_history):
+        """Count 30+/60+/90+ days-past-due months over the last 3/6/12/24 months
+
+        dpd{t}_months_{w}m counts the months among the last w in which any
+        account had a status of at least t; dpd{t}_accounts_{w}m counts the
+        accounts with at least one such month. Every window is read off one
+        prefix sum per account and threshold.
+        """
+        features = dict.fromkeys(_window_features(self.DELINQUENCY_WINDOWS, self.DPD_THRESHOLDS), 0)
+        if not payment_history or not isinstance(payment_history, list):
+            return features
+
+        statuses = [
+            [self.payment_status(account.get(key)) for key in self.PAYMENT_STATUS_KEYS]
+            for account in payment_history if isinstance(account, dict)
+        ]
+        for threshold in self.DPD_THRESHOLDS:
+            any_account = [False] * len(self.PAYMENT_STATUS_KEYS)
+            for account in statuses:
+                exceeds = [s is not None and s >= threshold for s in account]
+                prefix = list(accumulate(exceeds))
+                for window in self.DELINQUENCY_WINDOWS:
+                    if prefix[window - 1]:
+                        features[f'dpd{threshold}_accounts_{window}m'] += 1
+                any_account = [a or e for a, e in zip(any_account, exceeds)]
+            prefix = list(accumulate(any_account))
+            for window in self.DELINQUENCY_WINDOWS:
+                features[f'dpd{threshold}_months_{window}m'] = prefix[window - 1]
+        return features
+
+    def consumer_id(self, consumer_data):
+        """Bureau consumer id of a report, from subjectlist or personal details
+
+        Only non-empty string and integer ids count; other values (lists,
+        dicts, booleans) are treated as no id.
+        """
+        for key in ('subjectlist', 'personaldetailssummary'):
+            section = consumer_data.get(key)
+            if isinstance(section, dict):
+                consumer_id = section.get('consumerid')
+                if consumer_id and consumer_id.__class__ in (str, int):
+                    return consumer_id
+        return None
+
+    @property
+    def feature_names(self):
+        """All output features, opt-in ones included, in column order"""
+        return [name for section in self.SECTIONS.values() for name in section['features']]
+
+    def plan_features(self, features=None):
+        """Resolve a selection of output features to the sections that produce them
+
+        Returns ({name: section} in SECTIONS order, set of features to keep);
+        the set is None when no selection is given, which runs the default
+        sections. Unknown names raise ValueError.
+        """
+        if features is None:
+            return {name: section for name, section in self.SECTIONS.items()
+                    if section.get('default', True)}, None
+        keep = set(features)
+        unknown = keep.difference(self.feature_names)
+        if unknown:
+            raise ValueError(f'Unknown features: {sorted(unknown)}')
+        sections = {name: section for name, section in self.SECTIONS.items()
+                    if keep.intersection(section['features'])}
+        return sections, keep
+
+    def output_features(self, features=None):
+        """Output feature names for a selection (default: the default sections), in column order"""
+        sections, keep = self.plan_features(features)
+        return [name for section in sections.values() for name in section['features']
+                if keep is None or name in keep]
+
+    def input_keys(self, features=None):
+        """consumerfullcredit keys read to compute `features` (default: the default sections)"""
+        sections, _ = self.plan_features(features)
+        return [key for section in sections.values() for key in section['inputs']]
+
+    def _section_inputs(self, section, consumer_data):
+        return [consumer_data.get(key, default) for key, default in section['inputs'].items()]
+
+    # parse_numeric, skipping the method call unless a subclass overrides it
+    _parse = staticmethod(_parse_number)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.parse_numeric is not CreditBureauFeatureExtractor.parse_numeric:
+            cls._parse = cls.parse_numeric
+        cls._install_section_functions()
+
+    @classmethod
+    def _install_section_functions(cls):
+        """Set the method of each section with a spec to the function generated from it
+
+        Regenerated for every class, as the spec's field lists and number
+        parsing may be overridden; a method the class (or a base) defines
+        itself is kept.
+        """
+        # The number parsing is a pure function of its argument unless overridden
+        memo = (cls.clean_numeric is CreditBureauFeatureExtractor.clean_numeric
+                and cls.parse_numeric is CreditBureauFeatureExtractor.parse_numeric)
+        for section in cls.SECTIONS.values():
+            name = section['method']
+            inherited = getattr(cls, name, None)
+            if ('spec' not in section or name in vars(cls)
+                    or not (inherited is None or hasattr(inherited, '__source__'))):
+                continue
+            spec = {feature: {**rule, 'sum': getattr(cls, rule['sum'])}
+                    if isinstance(rule.get('sum'), str) else rule
+                    for feature, rule in section['spec'].items()}
+            setattr(cls, name, compile_section(name, list(section['inputs']), spec, memo))
+
+    def _run_section(self, section, inputs, as_of):
+        if section.get('as_of'):
+            return getattr(self, section['method'])(*inputs, as_of)
+        return getattr(self, section['method'])(*inputs)
+
+    def _extract_incremental(self, consumer_data, as_of, memo, sections, row):
+        """Re-run only the sections whose inputs changed since the consumer's last report"""
+        consumer_id = self.consumer_id(consumer_data)
+        previous = memo.get(consumer_id) if consumer_id is not None else None
+        current = {}
+        for name, section in sections.items():
+            inputs = self._section_inputs(section, consumer_data)
+            fingerprint = memo.fingerprint(inputs, as_of if section.get('as_of') else None)
+            if previous and previous.get(name, (None,))[0] == fingerprint:
+                result = previous[name][1]
+                memo.skipped += 1
+            else:
+                result = self._run_section(section, inputs, as_of)
+                memo.computed += 1
+            current[name] = (fingerprint, result)
+            row.update(result)
+        if consumer_id is not None:
+            memo.put(consumer_id, current)
+        return row
+
+    def _extract(self, credit_report, as_of, memo, plan):
+        sections, keep = plan
         features = {'application_id': credit_report.get('application_id')}
-        
+
         if not credit_report or 'data' not in credit_report:
             return features
-            
+
         data = credit_report['data']
         consumer_data = data.get('consumerfullcredit', {})
-        
-        # Process each data section
-        features.update(self.process_account_ratings(consumer_data.get('accountrating', {})))
-        features.update(self.process_credit_summary(consumer_data.get('creditaccountsummary', {})))
-        features.update(self.process_enquiry_history(consumer_data.get('enquiryhistorytop', [])))
-        features.update(self.process_credit_agreements(consumer_data.get('creditagreementsummary', [])))
-        features.update(self.process_delinquency(consumer_data.get('deliquencyinformation', {})))
-        features.update(self.process_personal_details(consumer_data.get('personaldetailssummary', {})))
-        features.update(self.process_guarantor_info(
-            consumer_data.get('guarantordetails', {}),
-            consumer_data.get('guarantorcount', {})
-        ))
-        
+        if memo is not None:
+            row = self._extract_incremental(consumer_data, as_of, memo, sections, {})
+        else:
+            # Process each data section
+            row = {}
+            for section in sections.values():
+                row.update(self._run_section(
+                    section, self._section_inputs(section, consumer_data), as_of))
+        if keep is None:
+            features.update(row)
+        else:
+            features.update((name, value) for name, value in row.items() if name in keep)
         return features
 
-    def process_reports(self, credit_reports):
-        """Process multiple credit reports into a DataFrame"""
-        features_list = []
-        
+    def extract_features(self, credit_report, as_of=None, memo=None, features=None):
+        """Main feature extraction method
+
+        Time-relative features (age, recent enquiries) are computed as of
+        `as_of`, so a report always maps to the same features for a given
+        reference time. Defaults to the current time.
+
+        With a `memo` (credit_bureau_cache.SectionMemo) each section is
+        fingerprinted and only sections that changed since the consumer's
+        previous report are recomputed. `features` selects output features
+        by name; only the sections producing them are run.
+        """
+        return self._extract(credit_report, as_of or datetime.now(), memo,
+                             self.plan_features(features))
+
+    def iter_features(self, credit_reports, as_of=None, memo=None, features=None):
+        """Lazily extract features from an iterable of credit reports"""
+        as_of = as_of or datetime.now()
+        plan = self.plan_features(features)
         for report in credit_reports:
             if not isinstance(report, dict) or 'application_id' not in report:
                 continue
-            features_list.append(self.extract_features(report))
-        
-        return pd.DataFrame(features_list).set_index('application_id')
+            yield self._extract(report, as_of, memo, plan)
+
+    def _process_parallel(self, credit_reports, workers, chunksize, as_of, features):
+        """Fan chunks of reports out to a process pool, yielding rows in input order
+
+        The value stats each chunk recorded are added to self.stats.
+        """
+        chunks = _chunked(credit_reports, chunksize)
+        head = list(islice(chunks, 2))
+        if len(head) < 2:
+            # A single chunk: pool startup would cost more than the work
+            for chunk in head:
+                rows, stats = _extract_chunk(self, as_of, features, chunk)
+                self.stats.update(stats)
+                yield from rows
+            return
+
+        import multiprocessing
+        with multiprocessing.Pool(workers) as pool:
+            for rows, stats in pool.imap(partial(_extract_chunk, self, as_of, features),
+                                         chain(head, chunks)):
+                self.stats.update(stats)
+                yield from rows
+
+    def _lookup_chunk(self, chunk, cache, as_of, features):
+        """(keys, cached rows, {key: report} to extract) of one chunk of reports"""
+        keys = [cache.key(self, report, as_of, features) for report in chunk]
+        rows = cache.get_many(keys)
+        misses = {}
+        for report, key in zip(chunk, keys):
+            if key not in rows:
+                misses.setdefault(key, report)
+        return keys, rows, misses
+
+    def _store_chunk(self, cache, chunk, lookup, extracted):
+        """Cache a chunk's extracted rows and yield all of its rows in input order"""
+        keys, rows, misses = lookup
+        extracted, stats = extracted
+        self.stats.update(stats)
+        fresh = {}
+        for key, row in zip(misses, extracted):
+            row.pop('application_id')
+            fresh[key] = row
+        cache.put_many(fresh)
+        rows.update(fresh)
+        for report, key in zip(chunk, keys):
+            yield {'application_id': report['application_id'], **rows[key]}
+
+    def _process_cached(self, credit_reports, cache, workers, chunksize, as_of, features):
+        """Serve reports seen before from `cache` and extract only the rest, chunk by chunk
+
+        Each chunk is looked up, its misses extracted and stored, then its
+        rows yielded, so memory stays bounded by the chunk size and repeats
+        in later chunks are served from the cache. With workers > 1 up to
+        `workers` chunks are extracted in a process pool at once; a repeat
+        within those in-flight chunks is extracted again.
+        """
+        valid = (r for r in credit_reports if isinstance(r, dict) and 'application_id' in r)
+        chunks = _chunked(valid, chunksize)
+        head = list(islice(chunks, 2)) if workers > 1 else []
+        if len(head) < 2:
+            # Serial, or a single chunk: pool startup would cost more than the work
+            for chunk in chain(head, chunks):
+                lookup = self._lookup_chunk(chunk, cache, as_of, features)
+                extracted = _extract_chunk(self, as_of, features, list(lookup[2].values()))
+                yield from self._store_chunk(cache, chunk, lookup, extracted)
+            return
+
+        import multiprocessing
+        with multiprocessing.Pool(workers) as pool:
+            pending = deque()
+            for chunk in chain(head, chunks):
+                lookup = self._lookup_chunk(chunk, cache, as_of, features)
+                task = pool.apply_async(_extract_chunk,
+                                        (self, as_of, features, list(lookup[2].values())))
+                pending.append((chunk, lookup, task))
+                if len(pending) > workers:
+                    chunk, lookup, task = pending.popleft()
+                    yield from self._store_chunk(cache, chunk, lookup, task.get())
+            for chunk, lookup, task in pending:
+                yield from self._store_chunk(cache, chunk, lookup, task.get())
+
+    def process_reports(self, credit_reports, workers=1, chunksize=DEFAULT_CHUNKSIZE,
+                        engine='python', as_of=None, cache=None, memo=None, features=None,
+                        output='frame'):
+        """Process multiple credit reports into a DataFrame
+
+        With workers > 1 (None for one per CPU) chunks of `chunksize` reports
+        are extracted in a process pool; inputs of a single chunk stay serial.
+        engine='columnar' flattens the whole batch into typed columns and
+        computes the features with vector operations instead (single process).
+
+        `as_of` is the reference time for age and recent-enquiry features.
+        It defaults to the time of the call, captured once for the batch, so
+        every report (and every worker) sees the same clock.
+
+        With a `cache` (credit_bureau_cache.FeatureCache) reports whose
+        payload was extracted before are served from it and only new ones
+        are extracted; as_of is then floored to the cache resolution.
+
+        With a `memo` (credit_bureau_cache.SectionMemo) reports are extracted
+        incrementally against each consumer's previous report (serially).
+
+        `features` (a list of output feature names) restricts the frame to
+        those columns and skips the sections that do not produce them.
+
+        Missing and malformed input values met by the python engine are
+        counted per field in self.stats (a credit_bureau_stats.ValueStats).
+
+        output='matrix' returns a credit_bureau_buffer.FeatureMatrix instead:
+        a C-contiguous float32 matrix with every selected feature in column
+        order, categories encoded with CATEGORY_CODES and missing values as
+        NaN, ready for a model's predict_proba without a DataFrame.
+        """
+        as_of = as_of or datetime.now()
+        if output not in ('frame', 'matrix'):
+            raise ValueError(f"Unknown output {output!r}, expected 'frame' or 'matrix'")
+        self.plan_features(features)  # reject unknown feature names up front
+        if engine == 'columnar':
+            if cache is not None or memo is not None:
+                raise ValueError("cache and memo are only supported with engine='python'")
+            from credit_bureau_columnar import compute_features
+            return compute_features(self, credit_reports, as_of, features, output)
+        if engine != 'python':
+            raise ValueError(f"Unknown engine {engine!r}, expected 'python' or 'columnar'")
+        if workers is None:
+            import multiprocessing
+            workers = multiprocessing.cpu_count()
+        if memo is not None and (cache is not None or workers > 1):
+            raise ValueError('memo cannot be combined with cache or workers > 1')
+        if cache is not None:
+            as_of = cache.bucket(as_of)
+            rows = self._process_cached(credit_reports, cache, workers, chunksize, as_of, features)
+        elif workers > 1:
+            rows = self._process_parallel(credit_reports, workers, chunksize, as_of, features)
+        else:
+            rows = self.iter_features(credit_reports, as_of, memo, features)
+        # Rows go straight into typed columns rather than a list of dicts;
+        # NumPy and pandas are only imported here, for batch output
+        from credit_bureau_buffer import FeatureBuffer
+        buffer = FeatureBuffer()
+        buffer.extend(rows)
+        if output == 'matrix':
+            return buffer.to_matrix(self.output_features(features), self.CATEGORY_CODES)
+        return buffer.to_frame()
+
+    def process_file(self, source, **kwargs):
+        """Stream reports from a JSON array / JSON Lines file into a DataFrame
+
+        Only the consumerfullcredit sections needed for the selected features
+        are kept while decoding; sections nothing reads are dropped.
+        """
+        keys = self.input_keys(kwargs.get('features'))
+        if kwargs.get('memo') is not None:
+            keys += ['subjectlist', 'personaldetailssummary']  # for consumer_id
+        return self.process_reports(iter_reports(source, keys=keys), **kwargs)
+
+
 
+CreditBureauFeatureExtractor._install_section_functions()
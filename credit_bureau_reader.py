@@ -0,0 +1,204 @@
+import codecs
+import json
+import os
+import re
+from json.decoder import scanstring
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+_DECODER = json.JSONDecoder()
+# A decode error this close to the end of the buffer may just be a value
+# cut off at the buffer edge (e.g. 'tru', '\\u00'), so more input is read
+_EDGE = 6
+
+
+class _TextStream:
+    """Sliding text buffer over a file that only holds the value being decoded"""
+
+    def __init__(self, read, chunk_size):
+        self.read = read
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.offset = 0  # position of buf[0] in the input
+        self.eof = False
+
+    def fill(self, size=None):
+        """Append the next chunk to the unread part of the buffer"""
+        if self.eof:
+            return False
+        chunk = self.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character, or '' at end of input"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def error(self, message, pos):
+        """ValueError for `message` at buffer position pos, located in the input"""
+        return ValueError(f'{message} at char {self.offset + pos} of the input')
+
+    def _truncated(self, exc):
+        # Only an error at the buffer edge can be fixed by reading more;
+        # anything earlier is malformed input
+        if isinstance(exc, IndexError):
+            return True
+        return (exc.msg.startswith('Unterminated string')
+                or exc.pos >= len(self.buf) - _EDGE)
+
+    def decode(self, decode):
+        """Decode one value at the cursor, reading ahead until it is complete"""
+        self.peek()
+        if len(self.buf) - self.pos < self.chunk_size:
+            # Keep a chunk of lookahead so values smaller than a chunk are not
+            # cut at the buffer edge, which would make them decode twice
+            self.fill()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = decode(self.buf, self.pos)
+            except (json.JSONDecodeError, IndexError) as exc:
+                # Truncated values fail to decode; grow the read size so a
+                # value much larger than a chunk is not re-scanned too often.
+                if not self._truncated(exc):
+                    raise self.error(exc.msg, exc.pos) from exc
+                if not self.fill(size):
+                    if isinstance(exc, IndexError):
+                        raise self.error('Unexpected end of input', len(self.buf)) from exc
+                    raise self.error(exc.msg, exc.pos) from exc
+                size *= 2
+                continue
+            if (self.buf[end - 1] not in '}]"'
+                    and _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf)
+                    and self.fill()):
+                continue  # a number at the buffer edge may still be growing
+            self.pos = end
+            return value
+
+
+def _text_reader(f):
+    """Return a read(size) function producing text from a text or binary file"""
+    first = f.read(0)
+    if isinstance(first, bytes):
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+
+        def read(size):
+            while True:
+                data = f.read(size)
+                text = decoder.decode(data, final=not data)
+                if text or not data:  # '' only at EOF, not mid multi-byte char
+                    return text
+        return read
+    return f.read
+
+
+def _object_decoder(member_decoder):
+    """Build a decode(s, pos) for a JSON object that only keeps some members
+
+    member_decoder(key) returns the decode function for that member, or
+    None to drop its value. Values that are not objects decode in full.
+    """
+    def decode(s, pos):
+        if s[pos] != '{':
+            return _DECODER.raw_decode(s, pos)
+        obj = {}
+        pos = _WHITESPACE.match(s, pos + 1).end()
+        if s[pos] == '}':
+            return obj, pos + 1
+        while True:
+            if s[pos] != '"':
+                raise json.JSONDecodeError('Expecting property name', s, pos)
+            key, pos = scanstring(s, pos + 1)
+            pos = _WHITESPACE.match(s, pos).end()
+            if s[pos] != ':':
+                raise json.JSONDecodeError("Expecting ':' delimiter", s, pos)
+            pos = _WHITESPACE.match(s, pos + 1).end()
+            value_decoder = member_decoder(key)
+            if value_decoder is None:
+                # Scanned by the C decoder and dropped at once: a pure Python
+                # skip is slower, and the cost of these sections is in
+                # keeping (and garbage collecting) their objects
+                pos = _DECODER.raw_decode(s, pos)[1]
+            else:
+                obj[key], pos = value_decoder(s, pos)
+            pos = _WHITESPACE.match(s, pos).end()
+            if s[pos] == '}':
+                return obj, pos + 1
+            if s[pos] != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", s, pos)
+            pos = _WHITESPACE.match(s, pos + 1).end()
+    return decode
+
+
+def _report_decoder(keys):
+    """decode(s, pos) keeping only data.consumerfullcredit[k] for k in keys
+
+    Other members of data and consumerfullcredit are dropped as soon as
+    they are scanned; members of the report outside data (application_id,
+    ...) are kept as usual.
+    """
+    keys = frozenset(keys)
+    full = _DECODER.raw_decode
+    consumer = _object_decoder(lambda key: full if key in keys else None)
+    data = _object_decoder(lambda key: consumer if key == 'consumerfullcredit' else None)
+    return _object_decoder(lambda key: data if key == 'data' else full)
+
+
+def _iter_values(stream, decode):
+    first = stream.peek()
+    if first == '\ufeff':
+        stream.pos += 1
+        first = stream.peek()
+    if first != '[':
+        # JSON Lines (or any whitespace separated sequence of values)
+        while first:
+            yield stream.decode(decode)
+            first = stream.peek()
+        return
+
+    stream.pos += 1
+    if stream.peek() == ']':
+        stream.pos += 1
+    else:
+        while True:
+            yield stream.decode(decode)
+            sep = stream.peek()
+            if sep not in (',', ']'):
+                raise stream.error(f"Expected ',' or ']' between reports, got {sep!r}", stream.pos)
+            stream.pos += 1
+            if sep == ']':
+                break
+    if stream.peek():
+        raise stream.error('Extra data after the report array', stream.pos)
+
+
+def iter_reports(source, chunk_size=DEFAULT_CHUNK_SIZE, keys=None):
+    """Yield credit reports one at a time from a JSON array or JSON Lines source
+
+    `source` is a path or an open text/binary file. Only the report currently
+    being decoded is held in memory, so peak memory does not grow with the
+    size of the file.
+
+    With `keys`, only those data.consumerfullcredit sections are kept; the
+    rest of data is dropped while decoding, so it is never held in memory.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from iter_reports(f, chunk_size, keys)
+        return
+    stream = _TextStream(_text_reader(source), chunk_size)
+    decode = _DECODER.raw_decode if keys is None else _report_decoder(keys)
+    yield from _iter_values(stream, decode)
@@ -0,0 +1,40 @@
+from collections import defaultdict
+
+# How a raw bureau value was coerced
+MISSING = 'missing'  # None or an empty placeholder such as '', '-' or 'null'
+COERCED = 'coerced'  # malformed, but a number was recovered from its digits
+INVALID = 'invalid'  # nothing usable; the feature's default is used
+
+
+class ValueStats:
+    """Counts of missing, coerced and invalid bureau values per field
+
+    The extractor records into its `stats` while extracting with the python
+    engine (process pool workers included), once per value a section reads.
+    Well-formed values are not counted, nor sections served from a cache or
+    memo.
+    """
+
+    def __init__(self):
+        self.counts = defaultdict(int)  # (field, kind) -> values; cheaper to bump than a Counter
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def record(self, field, kind):
+        self.counts[field, kind] += 1
+
+    def update(self, other):
+        """Add the counts of another ValueStats, e.g. from a worker"""
+        for key, count in other.counts.items():
+            self.counts[key] += count
+
+    def reset(self):
+        self.counts.clear()
+
+    def stats(self):
+        """{field: {kind: count}} of the values counted so far"""
+        fields = {}
+        for (field, kind), count in sorted(self.counts.items()):
+            fields.setdefault(field, {})[kind] = count
+        return fields
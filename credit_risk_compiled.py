@@ -0,0 +1,314 @@
+import json
+import mmap
+import os
+import sys
+
+import numpy as np
+
+DEFAULT_MAX_TRAVERSAL_ROWS = 32  # larger batches go through the trees' compiled apply
+ARTIFACT_MAGIC = b'CRMODEL1'
+ARTIFACT_ALIGNMENT = 64
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.path.join(MODEL_DIR, 'credit_risk_model.pkl')
+DEFAULT_ARTIFACT_PATH = os.path.join(MODEL_DIR, 'credit_risk_model.crm')
+
+
+def _pack_tree(tree, offset):
+    # Breadth-first order puts both children of a split next to each other,
+    # so a step is `children[node] + (x > threshold)`. Leaves point at
+    # themselves with an infinite threshold and stay put.
+    order = [0]
+    for node in order:
+        if tree.children_left[node] != -1:
+            order += [tree.children_left[node], tree.children_right[node]]
+    order = np.array(order, dtype=np.intp)
+    position = np.empty(tree.node_count, dtype=np.intp)
+    position[order] = np.arange(tree.node_count)
+    left = tree.children_left[order]
+    leaf = left == -1
+    feature = np.where(leaf, 0, tree.feature[order])
+    threshold = np.where(leaf, np.inf, tree.threshold[order])
+    children = np.where(leaf, np.arange(tree.node_count), position[np.where(leaf, 0, left)])
+    value = tree.value[order, 0, :]
+    return feature, threshold, children + offset, value / value.sum(axis=1, keepdims=True), position + offset
+
+
+class PackedForest:
+    """A fitted RandomForestClassifier flattened into NumPy arrays
+
+    Every node of every tree is a row of `feature`, `threshold`, `children`
+    (index of the left child; the right one follows it) and `value` (class
+    probabilities of a leaf); `roots` holds each tree's root. predict_proba
+    walks all trees for all rows one level per step, so a single applicant costs a few dozen small array operations
+    instead of sklearn's validation and per-tree dispatch. It compares the
+    float32 features with the float64 thresholds as sklearn does, and
+    matches its probabilities to rounding.
+
+    Past max_traversal_rows rows the level-by-level walk loses to the
+    trees' compiled traversal, so when built from a forest it keeps the
+    fitted trees, takes each tree's leaves from `tree_.apply` and averages
+    the packed leaf values (`tree_nodes` maps sklearn node ids to rows);
+    on this model that is still ahead of sklearn, which also validates the
+    input and dispatches every tree through joblib.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes,
+                 tree_nodes=None, trees=None, max_traversal_rows=DEFAULT_MAX_TRAVERSAL_ROWS):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.tree_nodes = tree_nodes
+        self.trees = trees
+        self.max_traversal_rows = max_traversal_rows
+        self._leaf = threshold == np.inf
+        self._n_features = int(feature.max()) + 1
+        if tree_nodes is not None:  # each class's leaf values in sklearn node order
+            self._tree_value = [np.ascontiguousarray(column) for column in value[tree_nodes].T]
+
+    @classmethod
+    def from_forest(cls, forest, **kwargs):
+        """Pack the trees of a fitted RandomForestClassifier"""
+        if forest.n_outputs_ != 1:
+            raise ValueError('Only single-output forests can be packed')
+        packed = []
+        offset = 0
+        for estimator in forest.estimators_:
+            packed.append(_pack_tree(estimator.tree_, offset))
+            offset += estimator.tree_.node_count
+        feature, threshold, children, value, tree_nodes = (np.concatenate(arrays)
+                                                           for arrays in zip(*packed))
+        roots = np.array([nodes[0] for *_, nodes in packed], dtype=np.intp)
+        return cls(feature.astype(np.intp), threshold, children, value, roots,
+                   forest.classes_, tree_nodes, [e.tree_ for e in forest.estimators_], **kwargs)
+
+    def arrays(self):
+        """The packed arrays by name, e.g. for np.savez"""
+        return {'feature': self.feature, 'threshold': self.threshold, 'children': self.children,
+                'value': self.value, 'roots': self.roots, 'classes': self.classes_}
+
+    def predict_proba(self, X):
+        """Class probabilities of each row of X (dense or scipy sparse), as sklearn's"""
+        X = np.ascontiguousarray(X.toarray() if hasattr(X, 'toarray') else X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] < self._n_features:
+            raise ValueError(f'Expected a 2-d array of at least {self._n_features} features')
+        if self.trees is not None and len(X) > self.max_traversal_rows:
+            return self._apply_proba(X)
+        return self._traverse_proba(X)
+
+    def _traverse_proba(self, X):
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat = X.ravel()
+        leaves = np.tile(self.roots, n_rows)  # row-major (row, tree) pairs
+        offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, n_trees)
+        pairs = np.arange(len(leaves))
+        node = leaves
+        while len(pairs):
+            node = self.children[node] + (flat[offsets + self.feature[node]] > self.threshold[node])
+            leaves[pairs] = node
+            walking = ~self._leaf[node]
+            pairs, node, offsets = pairs[walking], node[walking], offsets[walking]
+        return self.value[leaves].reshape(n_rows, n_trees, -1).sum(axis=1) / n_trees
+
+    def _apply_proba(self, X):
+        # Tree t's sklearn node ids start at roots[t] in tree_nodes, as its packed rows do
+        leaves = np.empty((len(self.trees), len(X)), dtype=np.intp)
+        for tree, root, out in zip(self.trees, self.roots, leaves):
+            np.add(tree.apply(X), root, out=out)
+        return np.stack([np.take(column, leaves).sum(axis=0) for column in self._tree_value],
+                        axis=1) / len(self.trees)
+
+
+def _is_missing(value):
+    # What CreditRiskScorer.frame turns into NaN, plus NaN itself
+    if isinstance(value, str):
+        return not value.strip()
+    return value is None or value != value
+
+
+def _steps(pipeline):
+    steps = dict(getattr(pipeline, 'steps', []))
+    if set(steps) - {'imputer', 'scaler', 'encoder'} or not steps:
+        raise ValueError(f'Cannot compile {pipeline!r}')
+    return steps.get('imputer'), steps.get('scaler'), steps.get('encoder')
+
+
+class CompiledPreprocessor:
+    """A fitted ColumnTransformer as lookup tables from raw records to feature rows
+
+    Compiled from the pipeline's preprocessor: numeric columns become
+    (column, index, fill, mean, scale) and categorical columns a
+    (column, fill, {category: index}) lookup, with the imputers' fill
+    values, the scalers' means and scales and the encoders' vocabularies.
+    transform maps applicant dicts straight to a dense float64 matrix,
+    equal to the transformer's output on CreditRiskScorer.frame(records):
+    None, NaN and blank strings are missing, numbers are scaled with the
+    same float64 operations and unknown categories stay all zero, as
+    with handle_unknown='ignore'. A record lacking any of the columns
+    raises ValueError, as the transformer would, rather than being imputed.
+    """
+
+    def __init__(self, n_features, numeric, categorical):
+        self.n_features = n_features
+        self.numeric = numeric
+        self.categorical = categorical
+
+    @classmethod
+    def from_column_transformer(cls, transformer):
+        """Compile a fitted ColumnTransformer of imputer/scaler and imputer/one-hot pipelines"""
+        numeric = []
+        categorical = []
+        for name, pipeline, columns in transformer.transformers_:
+            if isinstance(pipeline, str) and pipeline == 'drop':
+                continue
+            imputer, scaler, encoder = _steps(pipeline)
+            offset = transformer.output_indices_[name].start
+            fills = imputer.statistics_ if imputer is not None else [np.nan] * len(columns)
+            if encoder is None:
+                means = scaler.mean_ if scaler is not None and scaler.with_mean else [0.0] * len(columns)
+                scales = scaler.scale_ if scaler is not None and scaler.with_std else [1.0] * len(columns)
+                numeric += [(column, offset + i, float(fill), float(mean), float(scale))
+                            for i, (column, fill, mean, scale)
+                            in enumerate(zip(columns, fills, means, scales))]
+                continue
+            if (encoder.drop is not None or encoder.handle_unknown != 'ignore'
+                    or encoder.min_frequency is not None or encoder.max_categories is not None):
+                raise ValueError(f"Only OneHotEncoder(handle_unknown='ignore') compiles, not {encoder!r}")
+            for column, fill, categories in zip(columns, fills, encoder.categories_):
+                categorical.append((column, fill, {category: offset + i
+                                                   for i, category in enumerate(categories.tolist())}))
+                offset += len(categories)
+        n_features = max(indices.stop for indices in transformer.output_indices_.values())
+        return cls(n_features, numeric, categorical)
+
+    def tables(self):
+        """The lookup tables as JSON-serialisable lists (dict keys need not be strings)"""
+        return {'n_features': self.n_features, 'numeric': self.numeric,
+                'categorical': [(column, fill, list(lookup.items()))
+                                for column, fill, lookup in self.categorical]}
+
+    @classmethod
+    def from_tables(cls, tables):
+        """Rebuild from tables()"""
+        return cls(tables['n_features'], [tuple(entry) for entry in tables['numeric']],
+                   [(column, fill, {category: index for category, index in items})
+                    for column, fill, items in tables['categorical']])
+
+    def transform(self, records):
+        """Feature matrix of one {column: value} dict, a list of them or a DataFrame"""
+        if isinstance(records, dict):
+            records = [records]
+        elif hasattr(records, 'to_dict'):
+            records = records.to_dict('records')
+        positions = []
+        values = []
+        row = 0
+        for record in records:
+            try:
+                for column, index, fill, mean, scale in self.numeric:
+                    value = record[column]
+                    positions.append(row + index)
+                    values.append(((fill if _is_missing(value) else float(value)) - mean) / scale)
+                for column, fill, lookup in self.categorical:
+                    value = record[column]
+                    index = lookup.get(fill if _is_missing(value) else value)
+                    if index is not None:
+                        positions.append(row + index)
+                        values.append(1.0)
+            except KeyError:
+                missing = [entry[0] for entry in self.numeric + self.categorical
+                           if entry[0] not in record]
+                raise ValueError(f'columns are missing: {missing}') from None
+            row += self.n_features
+        X = np.zeros((len(records), self.n_features))
+        X.ravel()[positions] = values
+        return X
+
+
+class CompiledModel:
+    """The credit risk pipeline as a CompiledPreprocessor and a PackedForest
+
+    save() writes both into one flat artifact file: ARTIFACT_MAGIC, the
+    length of a JSON header, the header (preprocessor tables and the dtype,
+    shape and offset of every forest array) and the arrays, each aligned
+    to ARTIFACT_ALIGNMENT bytes. load() maps the file read-only and views
+    the arrays in place, so nothing large is unpickled or copied and every
+    process scoring from the same file shares its pages through the page
+    cache. Loading needs only NumPy; a loaded forest has no fitted trees
+    and walks them level by level at any batch size.
+
+        CompiledModel.from_pipeline(joblib.load('credit_risk_model.pkl')).save(path)
+        model = CompiledModel.load(path)      # in each worker
+        scores = model.score(record)
+    """
+
+    def __init__(self, preprocessor, forest):
+        self.preprocessor = preprocessor
+        self.forest = forest
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Compile a fitted Pipeline of a ColumnTransformer and a RandomForestClassifier"""
+        preprocessor, classifier = (step for _, step in pipeline.steps)
+        return cls(CompiledPreprocessor.from_column_transformer(preprocessor),
+                   PackedForest.from_forest(classifier))
+
+    def predict_proba(self, records):
+        """Class probabilities of one {column: value} dict, a list of them or a DataFrame"""
+        X = self.preprocessor.transform(records)
+        return self.forest.predict_proba(X) if len(X) else np.zeros((0, len(self.forest.classes_)))
+
+    def score(self, records):
+        """Probability of default of each record, as a float64 array"""
+        return self.predict_proba(records)[:, 1]
+
+    def save(self, path):
+        arrays = self.forest.arrays()
+        header = {'preprocessor': self.preprocessor.tables(), 'arrays': {}}
+        offset = 0
+        for name, array in arrays.items():
+            header['arrays'][name] = {'dtype': array.dtype.str, 'shape': array.shape,
+                                      'offset': offset}
+            offset += -(-array.nbytes // ARTIFACT_ALIGNMENT) * ARTIFACT_ALIGNMENT
+        encoded = json.dumps(header).encode()
+        start = len(ARTIFACT_MAGIC) + 8 + len(encoded)
+        start += -start % ARTIFACT_ALIGNMENT
+        with open(path, 'wb') as f:
+            f.write(ARTIFACT_MAGIC + len(encoded).to_bytes(8, 'little') + encoded)
+            for name, array in arrays.items():
+                f.seek(start + header['arrays'][name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Map an artifact written by save(); the forest arrays are read-only views of the file"""
+        with open(path, 'rb') as f:
+            if f.read(len(ARTIFACT_MAGIC)) != ARTIFACT_MAGIC:
+                raise ValueError(f'{path} is not a compiled credit risk model')
+            size = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(size))
+        start = len(ARTIFACT_MAGIC) + 8 + size
+        start += -start % ARTIFACT_ALIGNMENT
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        arrays = {name: np.frombuffer(data, spec['dtype'], int(np.prod(spec['shape'])),
+                                      start + spec['offset']).reshape(spec['shape'])
+                  for name, spec in header['arrays'].items()}
+        return cls(CompiledPreprocessor.from_tables(header['preprocessor']),
+                   PackedForest(arrays['feature'], arrays['threshold'], arrays['children'],
+                                arrays['value'], arrays['roots'], arrays['classes']))
+
+
+def main(model_path=DEFAULT_MODEL_PATH, artifact_path=DEFAULT_ARTIFACT_PATH):
+    import joblib
+
+    CompiledModel.from_pipeline(joblib.load(model_path)).save(artifact_path)
+    print(f'Wrote {artifact_path} ({os.path.getsize(artifact_path) / 1024:.0f} KiB) from {model_path}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL_PATH,
+         sys.argv[2] if len(sys.argv) > 2 else DEFAULT_ARTIFACT_PATH)
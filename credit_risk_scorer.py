@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  'credit_risk_model.pkl')
+DEFAULT_PORT = 8000
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT = 0.002  # seconds the first request of a batch waits for others
+
+
+def _blank_to_missing(record):
+    """Record with None and blank strings as NaN"""
+    return {key: np.nan if value is None or (isinstance(value, str) and not value.strip())
+            else value for key, value in record.items()}
+
+
+class CreditRiskScorer:
+    """The credit risk pipeline, loaded once and kept resident for scoring
+
+    load_seconds is the time joblib.load took; stats() reports the scoring
+    requests served since, timed separately from the load.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH):
+        self.model_path = model_path
+        start = time.perf_counter()
+        self.model = joblib.load(model_path)
+        self.load_seconds = time.perf_counter() - start
+        # The columns the preprocessor reads; the rest of feature_names_in_
+        # (e.g. 'unnamed:_0') is dropped and need not be sent
+        self.columns = [column for _, transformer, columns
+                        in self.model.named_steps['preprocessor'].transformers_
+                        if not (isinstance(transformer, str) and transformer == 'drop')
+                        for column in columns]
+        self.requests = 0
+        self.records = 0
+        self.request_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def validate(self, record):
+        """Raise if `record` is not a dict holding every column the model reads"""
+        if not isinstance(record, dict):
+            raise TypeError(f'Expected a {{feature: value}} record, got {type(record).__name__}')
+        missing = [column for column in self.columns if column not in record]
+        if missing:
+            raise ValueError(f'columns are missing: {missing}')
+
+    def frame(self, records):
+        """DataFrame of applicant records with every missing value as NaN
+
+        records is a DataFrame (not modified), one {feature: value} dict or
+        a list of them. None and blank strings become NaN, as blanks were in
+        training: the pipeline's imputers only see NaN as missing, so a None
+        would otherwise reach the encoder as an unknown category. Every
+        record must have all of `columns` (see validate), so a record lacking
+        one is rejected whatever it is batched with rather than imputed.
+        """
+        if isinstance(records, pd.DataFrame):
+            frame = records.replace(r'^\s*$', np.nan, regex=True)
+            objects = frame.columns[frame.dtypes == object]
+            frame[objects] = frame[objects].where(frame[objects].notna(), np.nan)
+            return frame
+        if isinstance(records, dict):
+            records = [records]
+        for record in records:
+            self.validate(record)
+        return pd.DataFrame([_blank_to_missing(record) for record in records],
+                            columns=self.columns)
+
+    def score(self, records):
+        """Probability of default of each record, as a float64 array"""
+        start = time.perf_counter()
+        frame = self.frame(records)
+        scores = self.model.predict_proba(frame)[:, 1] if len(frame) else np.zeros(0)
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.requests += 1
+            self.records += len(frame)
+            self.request_seconds += seconds
+        return scores
+
+    def stats(self):
+        """Model load time and the requests and records scored, with the mean request time"""
+        with self._lock:
+            return {'model_path': self.model_path, 'load_seconds': self.load_seconds,
+                    'requests': self.requests, 'records': self.records,
+                    'mean_request_seconds': (self.request_seconds / self.requests
+                                             if self.requests else 0.0)}
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-record score requests into batched predict_proba calls
+
+    Each `await batcher.score(record)` is queued; a batch closes once
+    max_batch_size records are waiting or max_wait seconds after its first
+    record arrived, is scored in one CreditRiskScorer.score call on a worker
+    thread (so the event loop keeps accepting requests) and every caller
+    gets its own probability back. Records are validated before they are
+    queued, so one lacking a column fails its caller at once; if a batch
+    still fails (e.g. a non-numeric amount) it is split in halves until
+    the bad records are isolated, so they only fail their own callers.
+
+        async with MicroBatcher(scorer) as batcher:
+            probability = await batcher.score(record)
+    """
+
+    def __init__(self, scorer, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.records = 0
+        self._queue = None
+        self._worker = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        """Start the batching task on the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """Score whatever is queued, then stop the batching task"""
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    async def score(self, record):
+        """Probability of default of one {feature: value} record"""
+        self.scorer.validate(record)
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _score_batch(self, loop, records):
+        """(score, exception) per record, splitting a failing batch in halves"""
+        try:
+            scores = await loop.run_in_executor(None, self.scorer.score, records)
+            return [(score, None) for score in scores.tolist()]
+        except Exception as exc:
+            if len(records) == 1:
+                return [(None, exc)]
+        middle = len(records) // 2
+        return (await self._score_batch(loop, records[:middle])
+                + await self._score_batch(loop, records[middle:]))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            results = await self._score_batch(loop, [record for record, _ in batch])
+            self.batches += 1
+            self.records += len(batch)
+            for (_, future), (score, exc) in zip(batch, results):
+                if not future.done():  # the caller may have been cancelled
+                    if exc is None:
+                        future.set_result(score)
+                    else:
+                        future.set_exception(exc)
+                self._queue.task_done()
+
+    def stats(self):
+        """Batches scored, records scored and the mean batch size"""
+        return {'batches': self.batches, 'records': self.records,
+                'mean_batch_size': self.records / self.batches if self.batches else 0.0}
+
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    """POST /score with a record, a list of records or {"records": [...]}; GET /stats"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, so clients can reuse connections
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # body would wait for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/stats':
+            return self._reply(404, {'error': f'Unknown path {self.path}'})
+        self._reply(200, self.server.scorer.stats())
+
+    def do_POST(self):
+        if self.path != '/score':
+            return self._reply(404, {'error': f'Unknown path {self.path}'})
+        start = time.perf_counter()
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if isinstance(body, dict) and 'records' in body:
+                body = body['records']
+            scores = self.server.scorer.score(body)
+        except (ValueError, TypeError, KeyError, AttributeError) as exc:
+            return self._reply(400, {'error': str(exc)})
+        self._reply(200, {'scores': scores.tolist(), 'seconds': time.perf_counter() - start})
+
+    def log_message(self, format, *args):
+        pass  # no per-request logging on the hot path
+
+
+def make_server(scorer, host='127.0.0.1', port=DEFAULT_PORT):
+    """HTTP server scoring with `scorer`; call serve_forever() to run it"""
+    server = ThreadingHTTPServer((host, port), _ScoringHandler)
+    server.scorer = scorer
+    return server
+
+
+def main(port=DEFAULT_PORT, model_path=DEFAULT_MODEL_PATH):
+    scorer = CreditRiskScorer(model_path)
+    server = make_server(scorer, port=port)
+    print(f'Loaded {model_path} in {scorer.load_seconds * 1000:.0f} ms; '
+          f'serving on http://{server.server_address[0]}:{server.server_port}/score')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT,
+         sys.argv[2] if len(sys.argv) > 2 else DEFAULT_MODEL_PATH)